@@ -0,0 +1,61 @@
+"""
+Micro-benchmark : analyse du texte d'une page avec les fonctions historiques
+(mentions "in", detect_size_and_ref, find_potential_price_in_text / parse_price)
+comparée à la passe unique de scan_text.
+
+Usage : python benchmarks/bench_matcher.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import scraper  # noqa: E402
+
+WORDS = (
+    "livraison offerte soin visage crème hydratante peau nouveauté "
+    "ajouter au panier avis clients ingrédients mode d'emploi Augustinus Bader "
+    "découvrez aussi sérum nettoyant fidélité retours gratuits"
+).split()
+
+
+def make_text(n_words, seed=0):
+    """
+    Texte de page synthétique : bruit + mentions produit, contenance et prix en fin de page.
+    """
+    rng = random.Random(seed)
+    words = [rng.choice(WORDS) for _ in range(n_words)]
+    words[n_words // 2:n_words // 2] = ["Augustinus", "Bader", "The", "Cream", "50", "ml", "229,00€"]
+    return " ".join(words)
+
+
+def legacy(text):
+    if "The Cream" in text and "Rich Cream" not in text and "Augustinus Bader" in text:
+        size, ref_price = scraper.detect_size_and_ref(text)
+        if size:
+            return size, scraper.find_potential_price_in_text(text)
+    return None, None
+
+
+def single_pass(text):
+    page = scraper._match_product(text)
+    if page["brand"] and page["size"]:
+        return page["size"], page["price"]
+    return None, None
+
+
+def main():
+    print(f"{'mots':>8} {'historique (ms)':>16} {'scan_text (ms)':>15} {'gain':>6}")
+    for n_words in (1_000, 10_000, 100_000):
+        text = make_text(n_words)
+        assert legacy(text) == single_pass(text), (legacy(text), single_pass(text))
+        number = max(1, 200_000 // n_words)
+        t_legacy = min(timeit.repeat(lambda: legacy(text), number=number, repeat=5)) / number
+        t_scan = min(timeit.repeat(lambda: single_pass(text), number=number, repeat=5)) / number
+        print(f"{n_words:>8} {t_legacy * 1000:>16.3f} {t_scan * 1000:>15.3f} {t_legacy / t_scan:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
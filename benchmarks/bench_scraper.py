@@ -0,0 +1,168 @@
+"""
+Benchmarks hors ligne du scraper, sur les pages de référence de fixtures.py.
+
+  python benchmarks/bench_scraper.py parse [--repeat 5]
+      Chemin d'analyse seul : BeautifulSoup + get_text + detect_size_and_ref
+      + find_potential_price_in_text (historique), comparé à analyze_page.
+
+  python benchmarks/bench_scraper.py e2e [--sizes 15 150 1500] [--latency-ms 100] ...
+      main() de bout en bout contre le serveur local (server.py), pour 15, 150 et 1500 URL ;
+      une exécution à froid puis une exécution à chaud (caches de la précédente).
+
+Les résultats donnent pages/s et latences p50 / p95 par page.
+Sous Linux, les URL sont réparties sur 15 hôtes 127.0.0.x (un par site) pour que
+la limite de connexions par hôte s'applique comme en production.
+"""
+import argparse
+import functools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+import fixtures  # noqa: E402
+import scraper  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _report(label, durations, wall=None):
+    wall = wall if wall is not None else sum(durations)
+    print(
+        f"{label:<28} {len(durations):>6} pages {len(durations) / wall:>9.1f} pages/s"
+        f"   p50 {_percentile(durations, 50) * 1000:>8.2f} ms   p95 {_percentile(durations, 95) * 1000:>8.2f} ms"
+    )
+
+
+def legacy_parse(html):
+    soup = BeautifulSoup(html, "html.parser")
+    full_text = soup.get_text(separator=" ")
+    size, _ = scraper.detect_size_and_ref(full_text)
+    return size, scraper.find_potential_price_in_text(full_text)
+
+
+def bench_parse(repeat):
+    pages = fixtures.load_all()
+    candidates = [("historique (get_text)", legacy_parse)]
+    for backend in ("html.parser", "lxml", "selectolax"):
+        if scraper._backend_available(backend):
+            candidates.append((f"analyze_page ({backend})", functools.partial(scraper._analyze, backend=backend)))
+    for label, func in candidates:
+        durations = []
+        for _ in range(repeat):
+            for html in pages.values():
+                start = time.perf_counter()
+                func(html)
+                durations.append(time.perf_counter() - start)
+        _report(label, durations)
+
+
+def _targets(n_urls, port, single_host):
+    targets = []
+    for i in range(n_urls):
+        index = i % len(fixtures.SITES)
+        slug, name, _, _ = fixtures.SITES[index]
+        host = "127.0.0.1" if single_host else f"127.0.0.{index + 1}"
+        url = f"http://{host}:{port}/{slug}/{i}"
+        targets.append({"name": f"{name} #{i}", "url": url, "require_brand": slug != "augustinusbader"})
+    return targets
+
+
+def _worker(n_urls, port, single_host, workdir):
+    """
+    Exécute main() dans `workdir` (processus séparé : état du module vierge) et
+    affiche le résultat en JSON.
+    """
+    os.chdir(workdir)
+    scraper.set_sites(_targets(n_urls, port, single_host))
+    # Le serveur local n'a pas besoin d'être ménagé : seul le débit du scraper est mesuré
+    scraper.HOST_RATE = 0
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            # Tous les sites à chaque exécution, dus ou non : le plan fausserait la mesure à chaud
+            scraper.main(["--all"])
+        finally:
+            sys.stdout = stdout
+    wall = time.perf_counter() - start
+    metrics_file = sorted(os.listdir(scraper.METRICS_DIR))[-1]
+    with open(os.path.join(scraper.METRICS_DIR, metrics_file), "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    pages = [r for r in records if r["type"] == "page"]
+    print(json.dumps({
+        "wall": wall,
+        "durations": [r["stages"]["total"] for r in pages],
+        "statuses": records[-1]["statuses"],
+    }))
+
+
+def bench_e2e(args):
+    from server import start_server
+
+    server = start_server(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, body_kb=args.body_kb,
+    )
+    port = server.server_address[1]
+    try:
+        for n_urls in args.sizes:
+            with tempfile.TemporaryDirectory() as workdir:
+                for run in ("froid", "chaud"):
+                    command = [sys.executable, __file__, "_worker", str(n_urls), str(port), workdir]
+                    if args.single_host:
+                        command.append("--single-host")
+                    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+                    result = json.loads(output.strip().splitlines()[-1])
+                    _report(f"main() {n_urls} URL, {run}", result["durations"], result["wall"])
+                    print(f"{'':<28} statuts : {result['statuses']}")
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne du scraper.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parse = commands.add_parser("parse", help="chemin d'analyse HTML seul")
+    parse.add_argument("--repeat", type=int, default=5)
+
+    e2e = commands.add_parser("e2e", help="main() de bout en bout contre le serveur local")
+    e2e.add_argument("--sizes", type=int, nargs="+", default=[15, 150, 1500])
+    e2e.add_argument("--latency-ms", type=float, default=100)
+    e2e.add_argument("--jitter-ms", type=float, default=50)
+    e2e.add_argument("--error-rate", type=float, default=0.0)
+    e2e.add_argument("--body-kb", type=int, default=None)
+    e2e.add_argument("--single-host", action="store_true",
+                     help="toutes les URL sur 127.0.0.1 (systèmes sans 127.0.0.x)")
+
+    worker = commands.add_parser("_worker")
+    worker.add_argument("n_urls", type=int)
+    worker.add_argument("port", type=int)
+    worker.add_argument("workdir")
+    worker.add_argument("--single-host", action="store_true")
+
+    args = parser.parse_args()
+    if args.command == "parse":
+        bench_parse(args.repeat)
+    elif args.command == "e2e":
+        bench_e2e(args)
+    else:
+        _worker(args.n_urls, args.port, args.single_host, args.workdir)
+
+
+if __name__ == "__main__":
+    main()
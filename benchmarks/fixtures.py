@@ -0,0 +1,120 @@
+"""
+Pages HTML de référence pour les benchmarks, une par site scrapé.
+
+Un fichier benchmarks/fixtures/<slug>.html (enregistré avec record_fixtures.py)
+est utilisé s'il existe ; sinon une page synthétique déterministe est générée,
+dans le style du site (données structurées ou non, taille, bruit).
+"""
+import json
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# (slug = nom court du site, nom du site dans sites.json, style de page, taille cible en Ko)
+SITES = [
+    ("augustinusbader", "Augustinus Bader (Officiel)", "jsonld", 400),
+    ("sephora", "Sephora France", "jsonld", 1500),
+    ("marionnaud", "Marionnaud France", "text", 300),
+    ("nocibe", "Nocibé", "text", 350),
+    ("ohmycream", "Oh My Cream", "shopify", 500),
+    ("printemps", "Printemps", "microdata", 600),
+    ("noseparis", "NOSE Paris", "meta", 250),
+    ("lookfantastic", "Lookfantastic", "jsonld", 700),
+    ("cultbeauty", "Cult Beauty", "jsonld", 700),
+    ("netaporter", "Net-A-Porter", "text", 2500),
+    ("beautylish", "Beautylish", "meta", 400),
+    ("libertylondon", "Liberty London", "microdata", 800),
+    ("mecca", "MECCA", "text", 600),
+    ("douglas", "Douglas", "jsonld", 900),
+    ("merci", "Merci", "shopify", 350),
+]
+
+NOISE_WORDS = (
+    "livraison offerte retours gratuits soin visage crème hydratante sérum nettoyant "
+    "nouveauté best-seller avis clients ingrédients mode d'emploi fidélité cadeau "
+    "newsletter compte panier rechercher maquillage parfum corps cheveux"
+).split()
+
+
+def _noise_block(rng, n_words):
+    words = [rng.choice(NOISE_WORDS) for _ in range(n_words)]
+    return " ".join(words)
+
+
+def _generate(slug, name, style, size_kb):
+    """
+    Page synthétique : en-tête et navigation, bloc produit (The Cream 50 ml à 229 €),
+    carrousel d'autres produits, scripts inline, pied de page ; complétée jusqu'à size_kb Ko.
+    """
+    rng = random.Random(slug)
+    title = "Augustinus Bader The Cream 50 ml"
+    price = "229.00"
+    head = [f"<title>{title} | {name}</title>"]
+    product = []
+
+    if style in ("jsonld", "shopify"):
+        data = {
+            "@context": "https://schema.org",
+            "@type": "Product",
+            "name": "The Cream 50 ml",
+            "brand": {"@type": "Brand", "name": "Augustinus Bader"},
+            "offers": {"@type": "Offer", "price": price, "priceCurrency": "EUR"},
+        }
+        head.append(f'<script type="application/ld+json">{json.dumps(data)}</script>')
+    if style == "meta":
+        head.append(f'<meta property="og:title" content="{title}">')
+        head.append(f'<meta property="product:price:amount" content="{price}">')
+        head.append('<meta property="product:price:currency" content="EUR">')
+    if style == "microdata":
+        product.append(
+            '<div itemscope itemtype="https://schema.org/Product">'
+            f'<h1 itemprop="name">{title}</h1>'
+            '<span itemprop="brand">Augustinus Bader</span>'
+            f'<span itemprop="price" content="{price}">229,00 €</span>'
+            '<meta itemprop="priceCurrency" content="EUR"></div>'
+        )
+    else:
+        product.append(f'<div class="product"><h1>{title}</h1><p class="price">229,00 €</p></div>')
+
+    nav = "".join(f'<li><a href="/c/{i}">{_noise_block(rng, 2)}</a></li>' for i in range(300))
+    carousel = "".join(
+        f'<div class="tile"><a href="/p/{i}">{_noise_block(rng, 4)}</a><span>{rng.randint(10, 300)},00€</span></div>'
+        for i in range(40)
+    )
+    script = "var state = " + json.dumps({"items": [_noise_block(rng, 20) for _ in range(200)]}) + ";"
+    parts = [
+        "<!DOCTYPE html><html lang='fr'><head>", *head, f"<script>{script}</script></head><body>",
+        f"<header><ul class='nav'>{nav}</ul></header>", "<main>", *product,
+        f"<section class='description'><p>{_noise_block(rng, 300)}</p></section>",
+        f"<section class='carousel'>{carousel}</section>", "</main>",
+    ]
+    body = "".join(parts)
+    filler = []
+    size = len(body.encode("utf-8"))
+    while size < size_kb * 1024:
+        block = f"<div class='reviews'><p>{_noise_block(rng, 200)}</p></div>"
+        filler.append(block)
+        size += len(block)
+    return body + "".join(filler) + f"<footer>{_noise_block(rng, 100)}</footer></body></html>"
+
+
+def load_fixture(slug):
+    """
+    Retourne le HTML de référence du site `slug` (enregistré s'il existe, sinon généré).
+    """
+    path = os.path.join(FIXTURES_DIR, f"{slug}.html")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    for site_slug, name, style, size_kb in SITES:
+        if site_slug == slug:
+            return _generate(site_slug, name, style, size_kb)
+    raise KeyError(slug)
+
+
+def load_all():
+    """
+    {slug: HTML} pour les 15 sites.
+    """
+    return {slug: load_fixture(slug) for slug, _, _, _ in SITES}
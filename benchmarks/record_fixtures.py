@@ -0,0 +1,53 @@
+"""
+Enregistre la page actuelle de chacun des 15 sites dans benchmarks/fixtures/<slug>.html,
+en exécutant le relevé du site correspondant du registre des sites (sites.json).
+
+Usage : python benchmarks/record_fixtures.py [slug ...]
+"""
+import os
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+import fixtures  # noqa: E402
+import scraper  # noqa: E402
+
+
+def main():
+    slugs = sys.argv[1:] or [slug for slug, _, _, _ in fixtures.SITES]
+    os.makedirs(fixtures.FIXTURES_DIR, exist_ok=True)
+    # Pages complètes, sans cache ni état des exécutions précédentes
+    scraper.STREAM_EARLY_STOP = False
+    scraper.MAX_BODY_BYTES = 50 * 1024 * 1024
+    scraper.HTTP_CACHE_DIR = tempfile.mkdtemp()
+    scraper.STATE_DIR = tempfile.mkdtemp()
+    original_fetch = scraper.fetch
+    names = {site["name"]: site for site in scraper.get_sites()}
+    sites = {slug: names[name] for slug, name, _, _ in fixtures.SITES}
+    for slug in slugs:
+        pages = []
+
+        def recording_fetch(url, **kwargs):
+            html = original_fetch(url, **kwargs)
+            pages.append(html)
+            return html
+
+        scraper.fetch = recording_fetch
+        try:
+            # Page HTML, même pour les sites lus via un adaptateur JSON
+            scraper.scrape_site(dict(sites[slug], adapter="html"))
+        finally:
+            scraper.fetch = original_fetch
+        if pages:
+            with open(os.path.join(fixtures.FIXTURES_DIR, f"{slug}.html"), "w", encoding="utf-8") as f:
+                f.write(pages[0])
+            print(f"{slug}: {len(pages[0]) // 1024} Ko")
+        else:
+            print(f"{slug}: échec du téléchargement")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Serveur HTTP local qui remplace les sites marchands pendant les benchmarks.
+
+GET /<slug>/<n> renvoie la page de référence du site <slug> (cf. fixtures.py),
+avec une latence, un taux d'erreurs et une taille de page réglables.
+
+Usage : python benchmarks/server.py --port 8800 --latency-ms 150 --error-rate 0.05
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        config = self.server.config
+        delay = config["latency_ms"] + random.uniform(0, config["jitter_ms"])
+        time.sleep(delay / 1000)
+
+        slug = self.path.strip("/").split("/")[0]
+        body = self.server.pages.get(slug)
+        if body is None:
+            self._send(404, b"not found")
+        elif random.random() < config["error_rate"]:
+            self._send(random.choice((500, 503)), b"error")
+        else:
+            self._send(200, body)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Le scraper ferme la connexion dès qu'il a lu le prix : ce n'est pas une erreur
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def start_server(port=0, latency_ms=0, jitter_ms=0, error_rate=0.0, body_kb=None):
+    """
+    Démarre le serveur dans un thread et le retourne (adresse : server.server_address).
+    `body_kb` complète chaque page jusqu'à cette taille (en Ko) si elle est plus petite.
+    Le serveur écoute sur toutes les adresses 127.0.0.x, ce qui permet de simuler
+    plusieurs hôtes sous Linux.
+    """
+    pages = {}
+    for slug, html in fixtures.load_all().items():
+        body = html.encode("utf-8")
+        if body_kb and len(body) < body_kb * 1024:
+            padding = b"<div hidden>" + b"x" * (body_kb * 1024 - len(body)) + b"</div>"
+            body = body.replace(b"</body>", padding + b"</body>")
+        pages[slug] = body
+
+    server = _Server(("", port), _Handler)
+    server.pages = pages
+    server.config = {"latency_ms": latency_ms, "jitter_ms": jitter_ms, "error_rate": error_rate}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--body-kb", type=int, default=None)
+    args = parser.parse_args()
+    server = start_server(args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.body_kb)
+    print(f"Serveur de benchmark sur le port {server.server_address[1]} (Ctrl+C pour arrêter)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
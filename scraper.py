@@ -1,22 +1,337 @@
+import argparse
+import calendar
+import codecs
+import contextlib
+import cProfile
+import functools
+import gzip
+import hashlib
+import importlib
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import re
+import signal
+import socket
+import sqlite3
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from email.utils import parsedate_to_datetime
+from html import escape as html_escape, unescape as html_unescape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util import make_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# --- Registre des sites ---
+# Sites suivis (nom, URL ou liste d'URL, type de page, adaptateur, filtres), cf. load_sites
+SITES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sites.json")
+SITE_KINDS = ("product", "listing")
+SITE_ADAPTERS = ("shopify", "next_data", "html")
+
+_sites = None
+_sites_lock = threading.Lock()
+# Extracteurs construits à la première URL d'un site et réutilisés pour les suivantes
+_extractors = {}
+_extractors_lock = threading.Lock()
 
 # --- Prix de référence ---
+# Produits suivis : nom, contenance, prix de référence par devise, termes d'exclusion
+# et seuil de réduction (en %) propres à chaque produit
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.json")
+# Seuil utilisé par défaut (en %) pour les produits du catalogue qui n'en précisent pas
+DEFAULT_DISCOUNT_THRESHOLD = 5
+# Prix de The Cream utilisés par detect_size_and_ref (fonction historique)
 REFERENCE_30ML = 170.0
 REFERENCE_50ML = 265.0
 
+# --- Concurrence ---
+# Nombre maximal de pages téléchargées en parallèle (tous sites confondus)
+MAX_CONCURRENT_FETCHES = 8
+# Nombre maximal de requêtes simultanées vers un même hôte
+MAX_FETCHES_PER_HOST = 2
+
+_host_semaphores = {}
+_host_semaphores_lock = threading.Lock()
+
+# --- Politesse envers les sites ---
+# Débit par hôte (seau à jetons) : requêtes par seconde en moyenne et rafale tolérée,
+# modifiables par site dans le registre ("rate", "burst") ; un débit de 0 lève la limite
+HOST_RATE = 1.0
+HOST_BURST = 2
+# Pause maximale (s) acceptée d'un en-tête Retry-After (429 / 503) ; au-delà,
+# les pages de l'hôte sont ignorées pour cette exécution
+RETRY_AFTER_MAX = 120
+# robots.txt : Disallow et Crawl-delay respectés, fichier gardé ROBOTS_TTL secondes
+# (ROBOTS_ERROR_TTL s'il était indisponible : tout est alors refusé, cf. RFC 9309)
+RESPECT_ROBOTS_TXT = True
+ROBOTS_FILE = "robots.json"
+ROBOTS_TTL = 24 * 3600
+ROBOTS_ERROR_TTL = 3600
+
+_host_buckets = {}
+_host_buckets_lock = threading.Lock()
+_robots = None
+_robots_parsers = {}
+_robots_lock = threading.Lock()
+_robots_host_locks = {}
+
+# --- Analyse HTML ---
+# Processus dédiés à l'analyse HTML (0 = analyse dans les threads de téléchargement)
+PARSE_WORKERS = os.cpu_count() or 1
+# Pages téléchargées en attente d'analyse (0 = 2 par processus)
+PARSE_QUEUE_SIZE = 0
+# "auto" (selectolax, sinon lxml, sinon html.parser selon ce qui est installé),
+# "html.parser", "lxml" ou "selectolax"
+PARSER_BACKEND = "auto"
+# Bloc produit (sélecteur CSS) appris par hôte lorsque le prix a été trouvé dans le texte :
+# les pages suivantes de l'hôte ne lisent que ce bloc tant qu'il donne un produit et un prix
+LOCATIONS_FILE = "locations.json"
+# Éléments contenant un symbole monétaire examinés au plus pour apprendre le bloc
+LOCATION_MAX_CANDIDATES = 20
+# Part maximale du texte de la page que peut représenter un bloc appris
+LOCATION_MAX_SHARE = 0.5
+
+_parse_pool = None
+_parse_slots = None
+_locations = None
+_locations_lock = threading.Lock()
+
+# --- Pages de liste (catégorie, recherche, collection) ---
+# Vignettes produit : classes usuelles des thèmes (Shopify, Salesforce Commerce...)
+LISTING_TILE_SELECTOR = (
+    ".product-card, .product-tile, .product-item, .grid-product, .card--product, "
+    "li.product, article.product, [data-product-id]"
+)
+# Lien vers la page suivante de la liste
+LISTING_NEXT_SELECTOR = 'link[rel="next"], a[rel="next"], .pagination a.next, .pagination__next a'
+# Pages de liste lues au plus par URL de départ
+LISTING_MAX_PAGES = 10
+# Fiches produit téléchargées au plus par liste, lorsque la vignette ne suffit pas
+LISTING_MAX_FOLLOW = 20
+
+# --- Adaptateurs JSON (Shopify, Next.js) ---
+# Plateforme détectée par hôte lors des exécutions précédentes ("shopify",
+# "next_data" ou "html" si l'adaptateur JSON n'a rien donné)
+ADAPTERS_FILE = "adapters.json"
+# Devise des prix des points d'accès JSON qui ne la précisent pas (Shopify)
+JSON_DEFAULT_CURRENCY = "EUR"
+# Produits par page de /collections/<handle>/products.json (250 au plus)
+SHOPIFY_PAGE_SIZE = 250
+
+_adapters = None
+_adapters_lock = threading.Lock()
+
+# --- Transport HTTP ---
+# Délais séparés : établissement de la connexion / lecture de la réponse
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 15
+# Nombre d'hôtes gardés dans le pool, et connexions keep-alive par hôte
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = MAX_FETCHES_PER_HOST
+# Durée de vie (s) des résolutions DNS mises en cache
+DNS_CACHE_TTL = 300
+
+_session = None
+_session_lock = threading.Lock()
+_dns_cache = {}
+_dns_cache_lock = threading.Lock()
+_original_getaddrinfo = socket.getaddrinfo
+
+# --- Plan de relevé ---
+# Statistiques par site (changements de prix, échecs, requêtes, dernières observations)
+POLLING_FILE = "polling.json"
+# Intervalle entre deux relevés d'un site : POLL_SAMPLES_PER_CHANGE relevés par changement
+# de prix attendu, POLL_MIN_INTERVAL si une offre est en cours, borné à POLL_MAX_INTERVAL
+POLL_SAMPLES_PER_CHANGE = 2
+POLL_MIN_INTERVAL = 3 * 3600
+POLL_MAX_INTERVAL = 7 * 24 * 3600
+# Demi-vie (s) des statistiques : les changements anciens comptent de moins en moins
+POLL_HALF_LIFE = 14 * 24 * 3600
+# Requêtes (estimées d'après les relevés précédents) au plus par exécution ; 0 = sans limite.
+# Une exécution en lots (--shard-count) le partage entre ses lots
+POLL_REQUEST_BUDGET = 100
+
+_polling = None
+_polling_lock = threading.Lock()
+
+# --- Mode veille (--daemon) ---
+# Intervalle (s) entre deux relevés (des sites dus, cf. plan_polling)
+DAEMON_INTERVAL = 3600
+# Adresse du point d'accès local (offres, santé des sites, état du processus)
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+# Fréquence (s) de vérification des fichiers surveillés (catalog.json, scraper.py)
+DAEMON_WATCH_INTERVAL = 5
+
+_daemon_responses = {}
+_site_health = {}
+
+# --- Répartition en lots ---
+# Résultats partiels de chaque lot (--shard-index / --shard-count), fusionnés par --merge
+RESULTS_DIR = "results"
+
+# --- Mesures ---
+# Un fichier JSONL par exécution (une ligne par page + une ligne de synthèse)
+METRICS_DIR = "metrics"
+# Sites (site_name) pour lesquels cProfile et tracemalloc sont activés (option --profile)
+PROFILE_SITES = set()
+
+_metrics_local = threading.local()
+_metrics_records = []
+# Pages téléchargées (hors cache HTTP frais) par site, pour le plan de relevé
+_metrics_requests = Counter()
+_metrics_lock = threading.Lock()
+# Un seul profileur actif à la fois dans le processus (obligatoire depuis Python 3.12)
+_profile_lock = threading.Lock()
+
+# --- Rapport HTML ---
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+# Au-delà, le rapport est découpé en plusieurs pages (index.html, page-2.html...)
+OFFERS_PER_PAGE = 100
+
+# --- Flux des changements ---
+# feed/latest.json (offres en cours), feed/delta.json (derniers changements) et
+# feed/atom.xml, réécrits uniquement lorsque les offres changent
+FEED_DIR = "feed"
+# Offres publiées et derniers changements, conservés entre deux exécutions
+FEED_STATE_FILE = "feed.json"
+# Événements conservés dans le flux Atom
+FEED_MAX_ENTRIES = 50
+
+# --- Téléchargement en streaming ---
+STREAM_CHUNK_SIZE = 64 * 1024
+# Arrêter la lecture dès que les marqueurs de prix structurés ont été vus
+STREAM_EARLY_STOP = True
+# Taille maximale (octets décompressés) lue par page ; la suite est ignorée
+MAX_BODY_BYTES = 3 * 1024 * 1024
+# Limites spécifiques par hôte, ex. {"www.net-a-porter.com": 1024 * 1024}
+MAX_BODY_BYTES_BY_HOST = {}
+
+# --- Robustesse ---
+# Budget de temps (s) de toute l'exécution : au-delà, les téléchargements restants
+# sont annulés et le rapport est publié avec les résultats obtenus
+RUN_TIME_BUDGET = 15 * 60
+# Nouvelles tentatives en cas d'erreur transitoire, avec attente exponentielle aléatoire
+FETCH_RETRIES = 2
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 10.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Disjoncteur par hôte : après CIRCUIT_FAILURE_THRESHOLD exécutions consécutives en échec
+# (un échec au plus compté par exécution), l'hôte est mis en pause (durée doublée à chaque
+# nouvel échec, plafonnée)
+CIRCUITS_FILE = "circuits.json"
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_BASE_COOLDOWN = 12 * 3600
+CIRCUIT_MAX_COOLDOWN = 7 * 24 * 3600
+
+_deadline = None
+_circuits = None
+_circuits_lock = threading.RLock()
+_probing_hosts = set()
+# Hôtes dont un échec a déjà été compté pendant l'exécution en cours
+_failed_hosts = set()
+
+# --- Cache HTTP sur disque ---
+# Répertoire conservé entre deux exécutions (cf. actions/cache dans le workflow)
+HTTP_CACHE_DIR = ".http_cache"
+# Taille maximale des corps en cache ; au-delà, les entrées les moins
+# récemment utilisées sont supprimées. Chaque lot (--shard-count) a son propre
+# cache (sous-répertoire de HTTP_CACHE_DIR) et une part de cette taille
+HTTP_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# --- Archive des réponses ---
+# Réponses téléchargées (URL, en-têtes, corps, date) ajoutées à ARCHIVE_DIR/<date>.warc.zst
+# (.warc.gz sans le paquet zstandard), un enregistrement compressé à part par réponse,
+# avec un index des positions (<fichier>.idx) ; activé par --archive
+ARCHIVE_RESPONSES = False
+ARCHIVE_DIR = "archive"
+ARCHIVE_ZSTD_LEVEL = 10
+# Enregistrements traités par lot lors de la réextraction (--reextract)
+REEXTRACT_CHUNK_SIZE = 64
+# Historique produit par la réextraction (dans STATE_DIR, sauf --reextract-output)
+REEXTRACT_DB = "prices-reextracted.sqlite"
+
+_archive_lock = threading.Lock()
+
+# --- État conservé entre deux exécutions ---
+STATE_DIR = ".scrape_state"
+# Empreinte du contenu normalisé + dernier résultat d'extraction, par URL
+FINGERPRINTS_FILE = "fingerprints.json"
+# Historique de toutes les observations (SQLite)
+PRICES_DB = "prices.sqlite"
+# Observations insérées par transaction : l'historique est écrit au fil du relevé
+STORE_BATCH_SIZE = 500
+# À incrémenter quand l'extraction change, pour invalider les résultats mémorisés
+EXTRACTION_VERSION = 5
+
+_fingerprints = None
+_fingerprints_lock = threading.Lock()
+
+_NORMALIZE_PATTERNS = [
+    # Scripts (hors JSON-LD, qui porte le prix), styles et commentaires
+    (re.compile(r"<script\b(?![^>]*application/ld\+json)[^>]*>.*?</script\s*>", re.I | re.S), ""),
+    (re.compile(r"<style\b[^>]*>.*?</style\s*>", re.I | re.S), ""),
+    (re.compile(r"<!--.*?-->", re.S), ""),
+    # Champs et balises meta portant un jeton CSRF
+    (re.compile(r"<(?:input|meta)\b[^>]*(?:csrf|xsrf|authenticity|token)[^>]*>", re.I), ""),
+    # Attributs variables à chaque requête
+    (re.compile(r"\s(?:nonce|integrity|data-csrf[\w-]*|data-request-id|data-timestamp)\s*=\s*(?:\"[^\"]*\"|'[^']*')", re.I), ""),
+    # Horodatages ISO 8601 et timestamps Unix (s / ms)
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"), ""),
+    (re.compile(r"\b1\d{9}(?:\d{3})?\b"), ""),
+    (re.compile(r"\s+"), " "),
+]
+
 # --- Fonctions utilitaires ---
 
-def check_discount(current_price, reference_price):
+def check_discount(current_price, reference_price, threshold=DEFAULT_DISCOUNT_THRESHOLD):
     """
-    Retourne True si le prix actuel représente une réduction >= 5%
+    Retourne True si le prix actuel représente une réduction >= threshold % (5% par défaut)
     par rapport au prix de référence.
     (Au lieu de 20% comme avant.)
     """
     if reference_price == 0:
         return False
     discount_percentage = (1 - (current_price / reference_price)) * 100
-    return discount_percentage >= 5
+    return discount_percentage >= threshold
 
 def parse_price(text):
     """
@@ -61,552 +376,3827 @@ def detect_size_and_ref(text):
     else:
         return None, 0
 
-# --- Fonctions de scraping (une par site) ---
+# --- Analyse du texte en une passe ---
+# parse_price / find_potential_price_in_text / detect_size_and_ref sont conservées
+# comme référence (cf. benchmarks/bench_matcher.py) ; l'extraction utilise scan_text.
 
-def scrape_augustinusbader():
-    results = []
-    site_name = "Augustinus Bader (Officiel)"
-    url = "https://augustinusbader.com/eu/en/the-cream-50-ml"
+_NUMBER = r"\d{1,3}(?:[.,\u00a0\u202f']\d{3})+(?:[.,]\d{1,2})?|\d+(?:[.,]\d{1,2})?"
 
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        # On veut "The Cream" (pas "The Rich Cream") 
-        # => on vérifie la mention "The Cream"
-        if "The Cream" in full_text and "Rich Cream" not in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size and ref_price > 0:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+# Ancres recherchées dans le texte en plus des termes du catalogue (noms, marques,
+# termes d'exclusion) : unités de contenance et devises.
+_ANCHORS = {
+    "ml": "ml",
+    "mL": "ml",
+    "Ml": "ml",
+    "ML": "ml",
+    "€": "EUR",
+    "EUR": "EUR",
+    "£": "GBP",
+    "GBP": "GBP",
+    "AUD": "AUD",
+    "USD": "USD",
+    "$": "$",
+}
+# Vérifications locales autour d'une ancre (fenêtre de quelques caractères)
+_ML_NUMBER_BEFORE = re.compile(r"(?<![\d.,])(\d+)\s?$")
+_PRICE_BEFORE = re.compile(r"(?<![\d.,\u00a0\u202f'])(" + _NUMBER + r")\s?$")
+_PRICE_AFTER = re.compile(r"\s?(" + _NUMBER + r")(?![\d.,]\d)")
+_WINDOW = 24
+_SIZE = re.compile(r"^(\d+)\s?ml$", re.I)
 
-    return results
+def _trie_branches(words, suffix=""):
+    """
+    Alternatives d'une expression régulière reconnaissant l'un des littéraux `words`,
+    factorisées par préfixes communs (une alternative par premier caractère) : avec des
+    milliers de termes, le moteur `re` ne teste plus chaque littéral à chaque position,
+    seulement la branche du caractère lu. `suffix` est ajouté à chaque alternative.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
 
-def scrape_sephora():
-    results = []
-    site_name = "Sephora France"
-    url = "https://www.sephora.fr/p/the-cream-P10010288.html"
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # Fin d'un terme plus court : la suite est facultative (la plus longue d'abord)
+            return "(?:" + pattern + ")?"
+        return pattern
 
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size and ref_price > 0:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+    return [re.escape(char) + build(child) + suffix for char, child in sorted(trie.items())]
 
-    return results
+def _anchor_matcher(anchors):
+    """
+    Compile l'expression qui relève tous les littéraux de `anchors` en une passe.
+    Les littéraux terminés par une lettre ne sont reconnus qu'en fin de mot.
+    Les alternatives de premier niveau restent des littéraux simples, ce qui permet
+    au moteur `re` de sauter directement d'un premier caractère candidat au suivant.
+    """
+    words = [anchor for anchor in anchors if anchor[-1].isalnum()]
+    others = [anchor for anchor in anchors if not anchor[-1].isalnum()]
+    return re.compile("|".join(_trie_branches(words, r"\b") + _trie_branches(others)))
 
-def scrape_marionnaud():
-    results = []
-    site_name = "Marionnaud France"
-    url = "https://www.marionnaud.fr/soin-visage/creme-de-jour/the-cream-50ml/p/BP_123456"
+def _size_label(text):
+    """
+    Contenance normalisée ("30ml", "30 mL" -> "30 ml"), ou None.
+    """
+    match = _SIZE.match(text.strip())
+    return f"{int(match.group(1))} ml" if match else None
 
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+class Catalog:
+    """
+    Produits suivis (cf. catalog.json) et index des termes à rechercher dans les pages.
 
-    return results
+    Chaque produit a un identifiant (sku), une marque, un nom, une contenance,
+    des prix de référence par devise, des termes d'exclusion (texte ou contenance,
+    ex. "Rich Cream", "travel", "15 ml") et un seuil de réduction en %.
+    """
 
-def scrape_nocibe():
-    results = []
-    site_name = "Nocibé"
-    url = "https://www.nocibe.fr/augustinus-bader-the-cream-50ml/p/123456"
+    def __init__(self, data):
+        self.data = data
+        self.digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        default_threshold = data.get("threshold", DEFAULT_DISCOUNT_THRESHOLD)
+        self.products = []
+        self.by_sku = {}
+        # Nom du produit -> positions dans le catalogue (ordre de préférence)
+        self.by_name = {}
+        anchors = dict(_ANCHORS)
+        for entry in data["products"]:
+            product = {
+                "sku": entry["sku"],
+                "brand": entry.get("brand"),
+                "name": entry["name"],
+                "size": _size_label(entry["size"]),
+                "reference_prices": {c.upper(): float(p) for c, p in entry["reference_prices"].items()},
+                "exclude_terms": [],
+                "exclude_sizes": [],
+                "threshold": entry.get("threshold", default_threshold),
+            }
+            if product["size"] is None:
+                raise ValueError(f"contenance invalide pour {entry['sku']} : {entry['size']}")
+            for term in entry.get("exclude", ()):
+                size = _size_label(term)
+                if size:
+                    product["exclude_sizes"].append(size)
+                    continue
+                product["exclude_terms"].append(term)
+                # Termes d'exclusion reconnus quelle que soit la casse usuelle
+                for variant in (term, term.lower(), term.upper(), term.capitalize()):
+                    anchors.setdefault(variant, term)
+            anchors.setdefault(product["name"], product["name"])
+            if product["brand"]:
+                anchors.setdefault(product["brand"], product["brand"])
+            self.by_name.setdefault(product["name"], []).append(len(self.products))
+            self.by_sku[product["sku"]] = product
+            self.products.append(product)
+        self.anchors = anchors
+        self.matcher = _anchor_matcher(anchors)
 
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+    def match(self, scan):
+        """
+        Premier produit du catalogue (dans l'ordre du fichier) dont le nom et la contenance
+        figurent dans le résultat de scan_text, sans aucun de ses termes d'exclusion.
+        Retourne (produit, marque trouvée) ou (None, False).
+        """
+        terms, sizes = scan["terms"], scan["sizes"]
+        for product in self._candidates(terms):
+            if product["size"] in sizes and not self._excluded(product, terms, sizes):
+                return product, bool(product["brand"]) and product["brand"] in terms
+        return None, False
 
-    return results
+    def mentions(self, scan):
+        """
+        Indique si le résultat de scan_text mentionne un produit du catalogue
+        (nom présent, sans ses termes d'exclusion), même sans sa contenance.
+        """
+        terms, sizes = scan["terms"], scan["sizes"]
+        return any(not self._excluded(product, terms, sizes) for product in self._candidates(terms))
 
-def scrape_ohmycream():
-    results = []
-    site_name = "Oh My Cream"
-    url = "https://en.ohmycream.com/products/the-rich-cream-creme-anti-age-riche"
-    # Remarque : L'URL mentionne "Rich Cream", mais on va quand même regarder
-    # le code filtrera "Rich Cream" => donc en théorie ça ne devrait rien remonter.
-    # À ajuster si vous voulez aussi suivre "The Rich Cream".
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        # Filtre "The Cream" (exclut "Rich Cream")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+    def _candidates(self, terms):
+        """
+        Produits dont le nom figure parmi `terms`, dans l'ordre du catalogue.
+        """
+        positions = sorted(i for name in terms.intersection(self.by_name) for i in self.by_name[name])
+        return [self.products[i] for i in positions]
 
-    return results
+    @staticmethod
+    def _excluded(product, terms, sizes):
+        return (any(t in terms for t in product["exclude_terms"])
+                or any(s in sizes for s in product["exclude_sizes"]))
 
-def scrape_printemps():
-    results = []
-    site_name = "Printemps"
-    url = "https://www.printemps.com/fr/fr/augustinus-bader-the-cream-50ml-1234567"
+_catalog = None
+_catalog_lock = threading.Lock()
 
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+def load_catalog(path=None):
+    """
+    Lit le catalogue des produits suivis (CATALOG_FILE par défaut).
+    """
+    with open(path or CATALOG_FILE, "r", encoding="utf-8") as f:
+        return Catalog(json.load(f))
 
-    return results
+def get_catalog():
+    """
+    Catalogue de l'exécution en cours (chargé au premier appel).
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = load_catalog()
+        return _catalog
 
-def scrape_noseparis():
-    results = []
-    site_name = "NOSE Paris"
-    url = "https://noseparis.com/fr/the-cream"
+def set_catalog(data):
+    """
+    Remplace le catalogue de l'exécution en cours (ex. dans les processus d'analyse,
+    qui reçoivent celui du processus principal).
+    """
+    global _catalog
+    catalog = Catalog(data)
+    with _catalog_lock:
+        _catalog = catalog
 
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+def _number_value(number):
+    """
+    Convertit un nombre au format local ("1.234,56", "1,234.56", "170", "170,5") en float :
+    un séparateur suivi de 1 ou 2 chiffres en fin de nombre est décimal, les autres
+    sont des séparateurs de milliers.
+    """
+    last = max(number.rfind("."), number.rfind(","))
+    if last >= 0 and len(number) - last - 1 <= 2:
+        integer, decimals = number[:last], number[last + 1:]
+    else:
+        integer, decimals = number, ""
+    for separator in ".,\u00a0\u202f'":
+        integer = integer.replace(separator, "")
+    return float(integer + "." + decimals) if decimals else float(integer)
 
-    return results
+def scan_text(text, catalog=None):
+    """
+    Parcourt `text` une seule fois et relève :
+    termes du catalogue (noms de produits, marques, termes d'exclusion),
+    contenances ("30 ml", "50ml"...) et premier prix trouvé pour chaque devise
+    (ex. "1.234,56 €", "£120", "A$ 250").
 
-def scrape_lookfantastic():
-    results = []
-    site_name = "Lookfantastic"
-    url = "https://www.lookfantastic.fr/augustinus-bader-the-cream-50ml/12345678.html"
+    Retourne un dict {"terms" (set), "sizes" (set), "prices" ({devise: prix})}.
+    """
+    catalog = catalog or get_catalog()
+    anchors = catalog.anchors
+    result = {
+        "terms": set(),
+        "sizes": set(),
+        "prices": {},
+    }
+    prices = result["prices"]
+    for match in catalog.matcher.finditer(text):
+        anchor = match.group()
+        kind = _ANCHORS.get(anchor)
+        start, end = match.span()
 
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+        if kind is None:
+            result["terms"].add(anchors[anchor])
+            continue
+        if kind == "ml":
+            number = _ML_NUMBER_BEFORE.search(text, max(0, start - _WINDOW), start)
+            if number is not None:
+                result["sizes"].add(f"{int(number.group(1))} ml")
+            continue
 
-    return results
+        # Devise : "A$" / "AU$" pour le dollar australien, codes ISO hors d'un mot
+        if kind == "$":
+            kind = "AUD" if text[max(0, start - 2):start].endswith(("A", "AU")) else "USD"
+        elif anchor.isalpha() and start > 0 and text[start - 1].isalpha():
+            continue
+        if kind in prices:
+            continue
+        number = _PRICE_BEFORE.search(text, max(0, start - _WINDOW), start)
+        if number is None:
+            number = _PRICE_AFTER.match(text, end)
+        if number is not None:
+            prices[kind] = _number_value(number.group(1))
+    return result
 
-def scrape_cultbeauty():
-    results = []
-    site_name = "Cult Beauty"
-    url = "https://www.cultbeauty.co.uk/augustinus-bader-the-cream-50ml.html"
+# --- Instrumentation ---
 
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+def _current_metrics():
+    """
+    Enregistrement de mesures de l'invocation en cours dans ce thread (ou None).
+    """
+    return getattr(_metrics_local, "record", None)
 
-    return results
+def _add_stage(stage, seconds):
+    """
+    Ajoute `seconds` au temps passé dans l'étape `stage` de l'invocation en cours.
+    """
+    record = _current_metrics()
+    if record is not None:
+        record["stages"][stage] = record["stages"].get(stage, 0.0) + seconds
 
-def scrape_netaporter():
-    results = []
-    site_name = "Net-A-Porter"
-    url = "https://www.net-a-porter.com/en-fr/shop/product/augustinus-bader/the-cream-50ml/1234567"
+def _stage_time(*stages):
+    """
+    Temps cumulé des étapes `stages` pour l'invocation en cours.
+    """
+    record = _current_metrics()
+    if record is None:
+        return 0.0
+    return sum(record["stages"].get(stage, 0.0) for stage in stages)
 
+def _set_metric(key, value):
+    """
+    Renseigne une mesure (statut HTTP, octets, etc.) de l'invocation en cours.
+    """
+    record = _current_metrics()
+    if record is not None:
+        record[key] = value
+
+@contextlib.contextmanager
+def instrument(site_name, url):
+    """
+    Mesure une invocation de scraper : temps par étape (dns, connect, ttfb, download,
+    fingerprint, parse, extract), octets reçus, statut HTTP, nombre de nœuds HTML
+    et pic mémoire du processus. Pour les sites de PROFILE_SITES, active aussi cProfile
+    (fichier .prof dans METRICS_DIR) et tracemalloc.
+    """
+    record = {
+        "site": site_name,
+        "url": url,
+        "status": None,
+        "http_status": None,
+        "cache": None,
+        "bytes": 0,
+        "body_bytes": 0,
+        "truncated": False,
+        "nodes": None,
+        "stages": {},
+        "peak_rss_kb": None,
+    }
+    _metrics_local.record = record
+    profiler = None
+    start = time.perf_counter()
     try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+        # Une page d'un site profilé pendant qu'une autre l'est déjà n'est pas profilée
+        if site_name in PROFILE_SITES and _profile_lock.acquire(blocking=False):
+            try:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+                profiler = cProfile.Profile()
+                profiler.enable()
+            except ValueError as e:
+                # Autre outil de profilage actif (sys.monitoring)
+                print(f"[{site_name}] Profilage impossible : {e}")
+                profiler = None
+                _profile_lock.release()
+        yield record
+    finally:
+        record["stages"]["total"] = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            _profile_lock.release()
+            # tracemalloc est global au processus : le pic inclut les autres threads actifs
+            record["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            name = re.sub(r"\W+", "-", site_name).strip("-").lower()
+            name += "-" + hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            profiler.dump_stats(os.path.join(METRICS_DIR, f"profile-{name}.prof"))
+        if resource is not None:
+            record["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        _metrics_local.record = None
+        with _metrics_lock:
+            _metrics_records.append(record)
+            if record["cache"] != "fresh":
+                _metrics_requests[site_name] += 1
 
-    return results
+def _prometheus_text(records, summary):
+    """
+    Convertit les mesures d'une exécution au format texte d'exposition Prometheus.
+    """
+    def labels(**values):
+        escaped = (
+            k + '="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ") + '"'
+            for k, v in values.items()
+        )
+        return "{" + ",".join(escaped) + "}"
 
-def scrape_beautylish():
-    results = []
-    site_name = "Beautylish"
-    url = "https://www.beautylish.com/s/augustinus-bader-the-cream-50ml"
+    lines = [
+        "# HELP scraper_stage_seconds Temps passé par étape et par page.",
+        "# TYPE scraper_stage_seconds gauge",
+    ]
+    for r in records:
+        for stage, seconds in sorted(r["stages"].items()):
+            lines.append(f"scraper_stage_seconds{labels(site=r['site'], url=r['url'], stage=stage)} {seconds:.6f}")
+    lines += [
+        "# HELP scraper_response_bytes Octets reçus par page.",
+        "# TYPE scraper_response_bytes gauge",
+    ]
+    lines += [f"scraper_response_bytes{labels(site=r['site'], url=r['url'])} {r['bytes']}" for r in records]
+    lines += [
+        "# HELP scraper_http_status Dernier statut HTTP par page (0 si aucune réponse).",
+        "# TYPE scraper_http_status gauge",
+    ]
+    lines += [f"scraper_http_status{labels(site=r['site'], url=r['url'])} {r['http_status'] or 0}" for r in records]
+    lines += [
+        "# HELP scraper_parse_nodes Nombre de balises HTML analysées par page.",
+        "# TYPE scraper_parse_nodes gauge",
+    ]
+    lines += [f"scraper_parse_nodes{labels(site=r['site'], url=r['url'])} {r['nodes'] or 0}" for r in records]
+    lines += [
+        "# HELP scraper_run_duration_seconds Durée totale de l'exécution.",
+        "# TYPE scraper_run_duration_seconds gauge",
+        f"scraper_run_duration_seconds {summary['duration']:.3f}",
+        "# HELP scraper_run_pages Pages traitées, par statut.",
+        "# TYPE scraper_run_pages gauge",
+    ]
+    for status, count in sorted(summary["statuses"].items()):
+        lines.append(f"scraper_run_pages{labels(status=status)} {count}")
+    if summary["peak_rss_kb"] is not None:
+        lines += [
+            "# HELP scraper_peak_rss_bytes Pic de mémoire résidente du processus.",
+            "# TYPE scraper_peak_rss_bytes gauge",
+            f"scraper_peak_rss_bytes {summary['peak_rss_kb'] * 1024}",
+        ]
+    return "\n".join(lines) + "\n"
 
-    try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+def write_metrics(started_at, duration, prometheus_path=None, suffix=None):
+    """
+    Écrit les mesures de l'exécution dans METRICS_DIR/run-<date>.jsonl
+    (run-<date>-<suffix>.jsonl pour un lot) et au format Prometheus dans
+    `prometheus_path` si fourni. Retourne le chemin JSONL.
+    """
+    with _metrics_lock:
+        records = sorted(_metrics_records, key=lambda r: (r["site"], r["url"]))
+    statuses = {}
+    for r in records:
+        statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+    summary = {
+        "type": "run",
+        "started_at": started_at,
+        "duration": duration,
+        "pages": len(records),
+        "statuses": statuses,
+        "bytes": sum(r["bytes"] for r in records),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else None,
+    }
+    lines = [json.dumps({"type": "page", **r}, ensure_ascii=False) for r in records]
+    lines.append(json.dumps(summary))
+    stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(started_at))
+    path = os.path.join(METRICS_DIR, f"run-{stamp}-{suffix}.jsonl" if suffix else f"run-{stamp}.jsonl")
+    _write_atomic(path, ("\n".join(lines) + "\n").encode("utf-8"))
+    if prometheus_path:
+        _write_atomic(prometheus_path, _prometheus_text(records, summary).encode("utf-8"))
+    return path
 
-    return results
+def _host_semaphore(url):
+    """
+    Retourne le sémaphore limitant les requêtes simultanées vers l'hôte de `url`.
+    """
+    host = urlsplit(url).hostname or ""
+    with _host_semaphores_lock:
+        semaphore = _host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(MAX_FETCHES_PER_HOST)
+            _host_semaphores[host] = semaphore
+    return semaphore
 
-def scrape_libertylondon():
-    results = []
-    site_name = "Liberty London"
-    url = "https://www.libertylondon.com/fr/augustinus-bader-the-cream-50ml-123456.html"
+def _cached_getaddrinfo(host, port, *args, **kwargs):
+    """
+    Remplace socket.getaddrinfo : garde les résolutions DNS pendant DNS_CACHE_TTL
+    secondes pour ne pas interroger le résolveur à chaque nouvelle connexion.
+    """
+    key = (host, port, args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    with _dns_cache_lock:
+        entry = _dns_cache.get(key)
+    if entry and entry[0] > now:
+        return entry[1]
+    start = time.perf_counter()
+    result = _original_getaddrinfo(host, port, *args, **kwargs)
+    _add_stage("dns", time.perf_counter() - start)
+    with _dns_cache_lock:
+        _dns_cache[key] = (now + DNS_CACHE_TTL, result)
+    return result
+
+class _TimedHTTPConnection(HTTPConnection):
+    """
+    Connexion HTTP qui mesure le temps d'établissement (hors résolution DNS).
+    """
+
+    def connect(self):
+        dns_before = _stage_time("dns")
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_stage("connect", time.perf_counter() - start - (_stage_time("dns") - dns_before))
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    """
+    Connexion HTTPS qui mesure le temps d'établissement TCP + TLS (hors résolution DNS).
+    """
+
+    def connect(self):
+        dns_before = _stage_time("dns")
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_stage("connect", time.perf_counter() - start - (_stage_time("dns") - dns_before))
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """
+    Adaptateur requests dont les connexions mesurent leur temps d'établissement.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+def get_session():
+    """
+    Retourne la session HTTP partagée par tous les scrapers (créée au premier appel) :
+    connexions keep-alive réutilisées par hôte, décompression gzip/deflate
+    (et brotli si le paquet `brotli` est installé), cache DNS.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            socket.getaddrinfo = _cached_getaddrinfo
+            adapter = _TimedHTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            # make_headers annonce uniquement les encodages que urllib3 sait décoder
+            session.headers["Accept-Encoding"] = make_headers(accept_encoding=True)["accept-encoding"]
+            _session = session
+    return _session
+
+def _cache_paths(url):
+    """
+    Retourne les chemins (métadonnées, corps) de l'entrée de cache associée à `url`.
+    """
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    base = os.path.join(HTTP_CACHE_DIR, key)
+    return base + ".json", base + ".body"
 
+def _write_atomic(path, data):
+    """
+    Écrit `data` (bytes) dans `path` via un fichier temporaire renommé,
+    pour ne jamais laisser un fichier à moitié écrit.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
     try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
 
-    return results
+def _parse_cache_control(headers):
+    """
+    Retourne les directives Cache-Control sous forme de dict
+    (ex. {"max-age": "300", "no-cache": None}).
+    """
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
 
-def scrape_mecca():
-    results = []
-    site_name = "MECCA"
-    url = "https://www.mecca.com.au/augustinus-bader/the-cream/I-123456.html"
+def _freshness_deadline(headers):
+    """
+    Calcule jusqu'à quand (timestamp) une réponse peut être resservie sans
+    revalidation, d'après Cache-Control (max-age, no-cache) puis Expires.
+    Retourne 0 si la réponse doit être revalidée à chaque fois.
+    """
+    directives = _parse_cache_control(headers)
+    if "no-cache" in directives:
+        return 0
+    now = time.time()
+    max_age = directives.get("s-maxage") or directives.get("max-age")
+    if max_age is not None:
+        try:
+            age = int(headers.get("Age", 0))
+            return now + int(max_age) - age
+        except ValueError:
+            return 0
+    if headers.get("Expires"):
+        try:
+            return parsedate_to_datetime(headers["Expires"]).timestamp()
+        except (TypeError, ValueError):
+            return 0
+    return 0
 
+def _load_cache_entry(url):
+    """
+    Retourne (métadonnées, corps) de l'entrée de cache de `url`, ou (None, None).
+    """
+    meta_path, body_path = _cache_paths(url)
     try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "rb") as f:
+            body = f.read()
+    except (OSError, ValueError):
+        return None, None
+    # Entrées enregistrées avant que les corps tronqués soient écartés du cache
+    if not meta.get("complete"):
+        return None, None
+    return meta, body
 
-    return results
+def _store_cache_entry(url, headers, body, encoding):
+    """
+    Enregistre une réponse 200 dans le cache, sauf si le serveur l'interdit (no-store).
+    """
+    meta_path, body_path = _cache_paths(url)
+    if "no-store" in _parse_cache_control(headers):
+        for path in (meta_path, body_path):
+            if os.path.exists(path):
+                os.unlink(path)
+        return
+    meta = {
+        "url": url,
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "fresh_until": _freshness_deadline(headers),
+        "encoding": encoding,
+        "size": len(body),
+        "complete": True,
+    }
+    _write_atomic(body_path, body)
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
 
-def scrape_douglas():
-    results = []
-    site_name = "Douglas"
-    url = "https://www.douglas.fr/fr/p/augustinus-bader-the-cream-50ml/3001048576"
+def _refresh_cache_entry(url, meta, headers):
+    """
+    Met à jour une entrée après un 304 : nouveaux validateurs et nouvelle fraîcheur.
+    """
+    meta_path, _ = _cache_paths(url)
+    meta["etag"] = headers.get("ETag") or meta.get("etag")
+    meta["last_modified"] = headers.get("Last-Modified") or meta.get("last_modified")
+    meta["fresh_until"] = _freshness_deadline(headers)
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+def prune_http_cache(max_bytes=None):
+    """
+    Supprime les entrées les moins récemment utilisées jusqu'à ce que le cache
+    tienne dans `max_bytes` (HTTP_CACHE_MAX_BYTES par défaut ; la date de modification
+    des métadonnées sert d'horodatage LRU).
+    """
+    max_bytes = HTTP_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(HTTP_CACHE_DIR):
+        return
+    entries = []
+    total = 0
+    for name in os.listdir(HTTP_CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        meta_path = os.path.join(HTTP_CACHE_DIR, name)
+        body_path = meta_path[:-len(".json")] + ".body"
+        try:
+            size = os.path.getsize(body_path)
+            last_used = os.path.getmtime(meta_path)
+        except OSError:
+            size, last_used = 0, 0
+        entries.append((last_used, size, meta_path, body_path))
+        total += size
+    entries.sort()
+    for _, size, meta_path, body_path in entries:
+        if total <= max_bytes:
+            break
+        for path in (meta_path, body_path):
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+        total -= size
 
+class _PriceMarkerScanner:
+    """
+    Repère, au fil du téléchargement, les marqueurs de prix structurés
+    (bloc JSON-LD avec un prix en EUR, meta product:price:amount + devise EUR,
+    microdata itemprop="price" + priceCurrency EUR).
+    `done` passe à True dès qu'un de ces marqueurs est complet ; _read_body vérifie
+    alors qu'il désigne bien un produit du catalogue avant d'arrêter la lecture.
+    Les blocs JSON-LD complets et la première valeur de chaque meta / microdata utile
+    sont conservés : le scanner se lit comme un document (ldjson_blocks, first), ce qui
+    permet d'appeler _structured_page sans analyser la page.
+    """
+
+    _TAG = re.compile(
+        r"<script\b[^>]*application/ld\+json[^>]*>"
+        r"|<meta\b[^>]*(?:product:price:(?:amount|currency)|product:brand|og:title)[^>]*>"
+        r"|<[a-z][^>]*\bitemprop=[\"']?(?:price(?:currency)?|name|brand)\b[^>]*>",
+        re.I,
+    )
+    _SCRIPT_END = re.compile(r"</script\s*>", re.I)
+    _NEXT_TAG = re.compile(r"<[^>]*>")
+    _LDJSON_PRICE = re.compile(r"\"(?:price|lowPrice)\"\s*:")
+    _ATTRIBUTE = re.compile(r"\b(itemprop|property|content)\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+))", re.I)
+    _VALUES = {
+        "itemprop": {"price", "pricecurrency", "name", "brand"},
+        "property": {"product:price:amount", "product:price:currency", "product:brand", "og:title"},
+    }
+    # Au-delà, un début de balise non terminé n'est pas conservé d'un morceau à l'autre
+    _MAX_CARRY = 4096
+
+    def __init__(self):
+        self.carry = ""
+        self.ldjson = None
+        self.blocks = []
+        self.values = {}
+        self.found = set()
+        self.done = False
+
+    def feed(self, text):
+        text = self.carry + text
+        pos = 0
+        while not self.done:
+            if self.ldjson is not None:
+                end = self._SCRIPT_END.search(text, pos)
+                if end is None:
+                    # On garde de quoi reconnaître un "</script>" coupé en deux
+                    keep = max(pos, len(text) - 32)
+                    self.ldjson.append(text[pos:keep])
+                    pos = keep
+                    break
+                self.ldjson.append(text[pos:end.start()])
+                block = "".join(self.ldjson)
+                self.ldjson = None
+                self.blocks.append(block)
+                pos = end.end()
+                if self._LDJSON_PRICE.search(block) and '"EUR"' in block:
+                    self.done = True
+                continue
+
+            match = self._TAG.search(text, pos)
+            if match is None:
+                last_tag = text.rfind("<", pos)
+                if last_tag >= 0 and len(text) - last_tag < self._MAX_CARRY:
+                    pos = last_tag
+                else:
+                    pos = len(text)
+                break
+            if match.group(0)[:7].lower() == "<script":
+                pos = match.end()
+                self.ldjson = []
+                continue
+            attributes = {
+                m.group(1).lower(): html_unescape(next(v for v in m.group(2, 3, 4) if v is not None))
+                for m in self._ATTRIBUTE.finditer(match.group(0))
+            }
+            content = attributes.get("content")
+            if content is None and "itemprop" in attributes:
+                # Valeur microdata dans le texte de l'élément, jusqu'à la balise suivante
+                # (complète : le corps peut être coupé juste après)
+                following = self._NEXT_TAG.search(text, match.end())
+                if following is None and len(text) - match.start() < self._MAX_CARRY:
+                    pos = match.start()
+                    break
+                end = following.start() if following is not None else len(text)
+                content = " ".join(html_unescape(text[match.end():end]).split())
+            pos = match.end()
+            for attr in ("itemprop", "property"):
+                key = (attr, attributes.get(attr, "").lower())
+                if key[1] in self._VALUES[attr] and content:
+                    self.values.setdefault(key, content)
+                    self.found.add(key)
+            if ({("property", "product:price:amount"), ("property", "product:price:currency")} <= self.found
+                    and self.first("property", "product:price:currency").strip().upper() == "EUR") or (
+                    {("itemprop", "price"), ("itemprop", "pricecurrency")} <= self.found
+                    and self.first("itemprop", "priceCurrency").strip().upper() == "EUR"):
+                self.done = True
+        self.carry = text[pos:]
+
+    def reset(self):
+        """
+        Reprend la recherche après un marqueur qui ne suffit pas à l'extraction
+        (seuls les marqueurs rencontrés ensuite pourront arrêter la lecture).
+        """
+        self.found.clear()
+        self.done = False
+
+    def ldjson_blocks(self):
+        return list(self.blocks)
+
+    def first(self, attr, value):
+        """
+        Première valeur relevée pour attr=value (cf. _SoupDocument.first), ou None.
+        """
+        return self.values.get((attr, value.lower()))
+
+def _read_body(resp, max_bytes, early_stop=True):
+    """
+    Lit le corps d'une réponse en streaming, par morceaux de STREAM_CHUNK_SIZE octets.
+    S'arrête dès que les données structurées lues jusque-là désignent un produit du
+    catalogue, avec sa marque et son prix (cf. _structured_page ; sauf si `early_stop`
+    est faux), ou après `max_bytes` octets. Sinon la page est lue en entier : le texte
+    complet sera nécessaire à l'extraction.
+    Retourne (corps en bytes, encodage, tronqué ou non).
+    """
+    early_stop = early_stop and STREAM_EARLY_STOP
+    encoding = resp.encoding or "utf-8"
     try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    except LookupError:
+        encoding = "utf-8"
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    scanner = _PriceMarkerScanner()
+    chunks = []
+    size = 0
+    truncated = False
+    for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        stop = False
+        if early_stop:
+            scanner.feed(decoder.decode(chunk))
+            if scanner.done:
+                # Vérifié sur les marqueurs relevés par le scanner, sans analyser la page
+                stop = _structured_page(scanner) is not None
+                if not stop:
+                    scanner.reset()
+        _check_deadline()
+        if stop or size >= max_bytes:
+            truncated = True
+            break
+    return b"".join(chunks), encoding, truncated
 
-    return results
+class CircuitOpenError(Exception):
+    """
+    L'hôte a échoué trop souvent, ou a demandé une pause (Retry-After) plus longue
+    que RETRY_AFTER_MAX : il est ignoré jusqu'à la fin de sa période de pause.
+    """
 
-def scrape_merci():
-    results = []
-    site_name = "Merci"
-    url = "https://merci-merci.com/en/collections/marque-augustinus-bader"
+class DeadlineExceeded(Exception):
+    """
+    Le budget de temps global de l'exécution (RUN_TIME_BUDGET) est épuisé.
+    """
+
+class BlockedError(requests.HTTPError):
+    """
+    Le site refuse (HTTP 403) ou limite (HTTP 429, après les nouvelles tentatives)
+    nos requêtes. Signalé à part des autres erreurs (statut "blocked").
+    """
+
+class RobotsDisallowed(Exception):
+    """
+    L'URL est exclue par le robots.txt du site (ou celui-ci est indisponible).
+    """
+
+def start_run_clock(budget=RUN_TIME_BUDGET):
+    """
+    Démarre le décompte du budget de temps global de l'exécution
+    (et le décompte des échecs par hôte, cf. _release_circuit).
+    """
+    global _deadline
+    _deadline = time.monotonic() + budget
+    with _circuits_lock:
+        _failed_hosts.clear()
+
+def _remaining_time():
+    """
+    Secondes restantes avant la fin du budget global (infini si aucun budget n'est fixé).
+    """
+    if _deadline is None:
+        return float("inf")
+    return _deadline - time.monotonic()
+
+def _check_deadline():
+    """
+    Lève DeadlineExceeded si le budget de temps global est épuisé.
+    """
+    if _remaining_time() <= 0:
+        raise DeadlineExceeded("budget de temps de l'exécution épuisé")
+
+def _load_circuits():
+    """
+    Charge (une seule fois par exécution) l'état des disjoncteurs par hôte.
+    """
+    global _circuits
+    with _circuits_lock:
+        if _circuits is None:
+            try:
+                with open(_state_path(CIRCUITS_FILE), "r", encoding="utf-8") as f:
+                    _circuits = json.load(f)
+            except (OSError, ValueError):
+                _circuits = {}
+    return _circuits
+
+def save_circuits():
+    """
+    Enregistre l'état des disjoncteurs pour l'exécution suivante.
+    """
+    with _circuits_lock:
+        if _circuits is None:
+            return
+        data = json.dumps(_circuits, sort_keys=True)
+    _write_atomic(_state_path(CIRCUITS_FILE), data.encode("utf-8"))
+
+def _acquire_circuit(host):
+    """
+    Vérifie que l'hôte peut être interrogé. Un disjoncteur ouvert lève CircuitOpenError ;
+    à la fin de la pause, une seule requête "sonde" par exécution est autorisée
+    (les autres URL de l'hôte sont ignorées tant qu'elle n'a pas réussi).
+    """
+    circuits = _load_circuits()
+    with _circuits_lock:
+        state = circuits.get(host)
+        if state is None or state["failures"] < CIRCUIT_FAILURE_THRESHOLD:
+            return
+        if state["open_until"] > time.time():
+            until = time.strftime("%Y-%m-%d %H:%M", time.gmtime(state["open_until"]))
+            raise CircuitOpenError(f"{host} ignoré jusqu'au {until} UTC ({state['failures']} échecs)")
+        if host in _probing_hosts:
+            raise CircuitOpenError(f"{host} en cours de test")
+        _probing_hosts.add(host)
+
+def _release_circuit(host, success):
+    """
+    Met à jour le disjoncteur de l'hôte après une requête : un succès le referme,
+    un échec allonge la pause (doublée à chaque échec au-delà du seuil). Un seul échec
+    est compté par hôte et par exécution, quel que soit le nombre de ses URL.
+    `success` vaut None si la requête n'a pas abouti pour une autre raison (budget
+    épuisé, hôte en pause).
+    """
+    circuits = _load_circuits()
+    with _circuits_lock:
+        _probing_hosts.discard(host)
+        if success is None:
+            return
+        if success:
+            circuits.pop(host, None)
+            return
+        if host in _failed_hosts:
+            return
+        _failed_hosts.add(host)
+        state = circuits.setdefault(host, {"failures": 0, "open_until": 0})
+        state["failures"] += 1
+        if state["failures"] >= CIRCUIT_FAILURE_THRESHOLD:
+            excess = state["failures"] - CIRCUIT_FAILURE_THRESHOLD
+            cooldown = min(CIRCUIT_MAX_COOLDOWN, CIRCUIT_BASE_COOLDOWN * 2 ** excess)
+            state["open_until"] = time.time() + cooldown
 
+# --- Politesse : débit par hôte, Retry-After, robots.txt ---
+
+class _TokenBucket:
+    """
+    Seau à jetons d'un hôte : `rate` requêtes par seconde en moyenne, `burst` d'affilée
+    au plus (un Crawl-delay de robots.txt abaisse ces limites). Une pause (Retry-After,
+    attente après un 429 / 503) retarde toutes les requêtes de l'hôte ; au-delà de
+    RETRY_AFTER_MAX, l'hôte est ignoré jusqu'à la fin de la pause (cf. skipped).
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.lock = threading.Lock()
+        self.rate = HOST_RATE if rate is None else rate
+        self.burst = HOST_BURST if burst is None else burst
+        self.crawl_delay = 0.0
+        self.tokens = float(self._limits()[1])
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.skip_until = 0.0
+
+    def _limits(self):
+        rate, burst = self.rate, max(1, self.burst)
+        if self.crawl_delay:
+            rate = min(rate, 1 / self.crawl_delay) if rate > 0 else 1 / self.crawl_delay
+            burst = 1
+        return rate, burst
+
+    def _refill(self, now):
+        rate, burst = self._limits()
+        if rate > 0:
+            self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        return rate
+
+    def configure(self, rate=None, burst=None, crawl_delay=None):
+        with self.lock:
+            self._refill(time.monotonic())
+            # Jetons déjà dépensés dans la rafale en cours, reportés sur les nouvelles limites
+            spent = self._limits()[1] - self.tokens
+            if rate is not None:
+                self.rate = rate
+            if burst is not None:
+                self.burst = burst
+            if crawl_delay is not None:
+                self.crawl_delay = crawl_delay
+            self.tokens = min(self.tokens, self._limits()[1] - spent)
+
+    def ready_in(self):
+        """
+        Secondes avant qu'une requête puisse partir (sans prendre de jeton).
+        """
+        with self.lock:
+            now = time.monotonic()
+            rate = self._refill(now)
+            wait = self.paused_until - now
+            if rate > 0 and self.tokens < 1:
+                wait = max(wait, (1 - self.tokens) / rate)
+            return max(0.0, wait)
+
+    def reserve(self):
+        """
+        Prend un jeton (à crédit si le seau est vide) et retourne l'attente avant
+        d'envoyer la requête : les requêtes en attente partent à tour de rôle.
+        """
+        with self.lock:
+            now = time.monotonic()
+            rate = self._refill(now)
+            wait = self.paused_until - now
+            if rate > 0:
+                self.tokens -= 1
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens / rate)
+            return max(0.0, wait)
+
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            if seconds > RETRY_AFTER_MAX:
+                self.skip_until = max(self.skip_until, self.paused_until)
+
+    def skipped(self):
+        """
+        Vrai si l'hôte a demandé une pause plus longue que RETRY_AFTER_MAX, encore en cours.
+        """
+        with self.lock:
+            return time.monotonic() < self.skip_until
+
+def _host_bucket(url):
+    """
+    Retourne le seau à jetons de l'hôte de `url`.
+    """
+    host = urlsplit(url).hostname or ""
+    with _host_buckets_lock:
+        bucket = _host_buckets.get(host)
+        if bucket is None:
+            bucket = _TokenBucket()
+            _host_buckets[host] = bucket
+    return bucket
+
+def configure_host(url, rate=None, burst=None):
+    """
+    Fixe le débit autorisé vers l'hôte de `url` (requêtes par seconde, rafale) ;
+    None conserve la valeur actuelle (HOST_RATE, HOST_BURST par défaut).
+    """
+    _host_bucket(url).configure(rate, burst)
+
+def _throttle(url):
+    """
+    Attend que l'hôte de `url` puisse recevoir une requête (temps compté dans l'étape
+    "throttle"). Lève CircuitOpenError si l'hôte a demandé une pause plus longue que
+    RETRY_AFTER_MAX, DeadlineExceeded si l'attente dépasse le budget de temps global.
+    """
+    wait = _host_bucket(url).reserve()
+    if wait <= 0:
+        return
+    host = urlsplit(url).hostname or ""
+    if wait > RETRY_AFTER_MAX:
+        raise CircuitOpenError(f"{host} en pause pendant {wait:.0f}s (Retry-After)")
+    if wait >= _remaining_time():
+        raise DeadlineExceeded(f"attente de {wait:.0f}s avant {host} au-delà du budget de temps")
+    _add_stage("throttle", wait)
+    time.sleep(wait)
+
+def _retry_after(response):
+    """
+    Délai (s) demandé par l'en-tête Retry-After de `response` (nombre de secondes
+    ou date HTTP), ou None s'il est absent ou illisible.
+    """
+    value = (response.headers.get("Retry-After") or "").strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return float(value)
     try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        full_text = soup.get_text(separator=" ")
-        if "The Cream" in full_text and "Rich Cream" not in full_text and "Augustinus Bader" in full_text:
-            size, ref_price = detect_size_and_ref(full_text)
-            if size:
-                price_found = find_potential_price_in_text(full_text)
-                if price_found and check_discount(price_found, ref_price):
-                    results.append({
-                        "site": site_name,
-                        "url": url,
-                        "product": f"The Cream {size}",
-                        "size": size,
-                        "current_price": price_found,
-                        "reference_price": ref_price,
-                    })
-    except Exception as e:
-        print(f"[{site_name}] Erreur: {e}")
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
 
-    return results
+def _load_robots():
+    """
+    Charge (une seule fois par exécution) les robots.txt mis en cache, par hôte.
+    """
+    global _robots
+    with _robots_lock:
+        if _robots is None:
+            try:
+                with open(_state_path(ROBOTS_FILE), "r", encoding="utf-8") as f:
+                    _robots = json.load(f)
+            except (OSError, ValueError):
+                _robots = {}
+    return _robots
 
+def save_robots():
+    """
+    Enregistre les robots.txt pour les exécutions suivantes (entrées périmées exclues).
+    """
+    with _robots_lock:
+        if _robots is None:
+            return
+        now = time.time()
+        data = json.dumps({h: e for h, e in _robots.items() if e["expires_at"] > now}, sort_keys=True)
+    _write_atomic(_state_path(ROBOTS_FILE), data.encode("utf-8"))
 
-def main():
-    """
-    Appelle les 15 fonctions de scraping,
-    compile les offres détectées (réduc >= 5%),
-    génère index.html (mise en page simple, responsive).
-    """
-    all_offers = []
-
-    # 1. Appeler toutes les fonctions
-    all_offers.extend(scrape_augustinusbader())
-    all_offers.extend(scrape_sephora())
-    all_offers.extend(scrape_marionnaud())
-    all_offers.extend(scrape_nocibe())
-    all_offers.extend(scrape_ohmycream())
-    all_offers.extend(scrape_printemps())
-    all_offers.extend(scrape_noseparis())
-    all_offers.extend(scrape_lookfantastic())
-    all_offers.extend(scrape_cultbeauty())
-    all_offers.extend(scrape_netaporter())
-    all_offers.extend(scrape_beautylish())
-    all_offers.extend(scrape_libertylondon())
-    all_offers.extend(scrape_mecca())
-    all_offers.extend(scrape_douglas())
-    all_offers.extend(scrape_merci())
-
-    # 2. Génération HTML
-    with open("index.html", "w", encoding="utf-8") as f:
-        f.write("<!DOCTYPE html><html lang='fr'>\n")
-        f.write("<head>\n")
-        f.write("  <meta charset='UTF-8'/>\n")
-        f.write("  <meta name='viewport' content='width=device-width, initial-scale=1.0'/>\n")
-        f.write("  <title>Offres Augustinus Bader – The Cream</title>\n")
-        f.write("""
-  <style>
-    body {
-      font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
-      max-width: 600px; 
-      margin: 20px auto; 
-      padding: 10px; 
-      line-height: 1.5; 
-      color: #333; 
-      background: #fff;
-    }
-    h1 {
-      font-size: 1.4em; 
-      margin-bottom: 0.5em; 
-      text-align: center;
-    }
-    .offers-list {
-      list-style: none; 
-      padding: 0; 
-      margin: 0;
-    }
-    .offer {
-      background: #f9f9f9; 
-      border-radius: 6px; 
-      margin-bottom: 1em; 
-      padding: 10px 14px;
+def _fetch_robots(url):
+    """
+    Télécharge le robots.txt de l'hôte de `url` (en respectant son débit) ; retourne
+    l'entrée à mettre en cache {"expires_at", "status", "body"}, ou None si l'hôte
+    ne répond pas (la requête de la page échouera d'elle-même).
+    """
+    parts = urlsplit(url)
+    robots_url = urlunsplit((parts.scheme, parts.netloc, "/robots.txt", "", ""))
+    start = time.perf_counter()
+    try:
+        with _host_semaphore(url):
+            _throttle(url)
+            _check_deadline()
+            remaining = _remaining_time()
+            timeout = (min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining))
+            resp = get_session().get(robots_url, timeout=timeout)
+    except requests.RequestException:
+        return None
+    finally:
+        _add_stage("robots", time.perf_counter() - start)
+    ttl = ROBOTS_ERROR_TTL if resp.status_code >= 500 else ROBOTS_TTL
+    return {
+        "expires_at": int(time.time() + ttl),
+        "status": resp.status_code,
+        "body": resp.text if resp.status_code == 200 else "",
     }
-    .offer strong {
-      color: #0072E5;
+
+def _robots_parser(url):
+    """
+    Règles du robots.txt de l'hôte de `url`, lues dans le cache (ROBOTS_FILE) ou
+    téléchargées ; None si l'hôte ne répond pas. Un robots.txt absent (4xx) permet tout,
+    un robots.txt indisponible (5xx) interdit tout. Le Crawl-delay (ou Request-rate)
+    du groupe qui s'applique à notre User-Agent ralentit le seau à jetons de l'hôte.
+    """
+    host = urlsplit(url).hostname or ""
+    robots = _load_robots()
+    with _robots_lock:
+        host_lock = _robots_host_locks.setdefault(host, threading.Lock())
+    # Un seul téléchargement par hôte, même si plusieurs pages de l'hôte arrivent ensemble
+    with host_lock:
+        with _robots_lock:
+            entry = robots.get(host)
+            parser = _robots_parsers.get(host)
+        if entry is None or entry["expires_at"] <= time.time():
+            entry = _fetch_robots(url)
+            if entry is None:
+                return None
+            parser = None
+            with _robots_lock:
+                robots[host] = entry
+        if parser is None:
+            parser = RobotFileParser()
+            if entry["status"] >= 500:
+                parser.disallow_all = True
+            elif entry["status"] >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(entry["body"].splitlines())
+            agent = get_session().headers["User-Agent"]
+            delay = parser.crawl_delay(agent)
+            request_rate = parser.request_rate(agent)
+            if request_rate and request_rate.requests:
+                delay = max(delay or 0, request_rate.seconds / request_rate.requests)
+            _host_bucket(url).configure(crawl_delay=float(delay or 0))
+            with _robots_lock:
+                _robots_parsers[host] = parser
+    return parser
+
+def _check_robots(url):
+    """
+    Lève RobotsDisallowed si le robots.txt de l'hôte exclut `url` (cf. RESPECT_ROBOTS_TXT).
+    """
+    if not RESPECT_ROBOTS_TXT:
+        return
+    parser = _robots_parser(url)
+    if parser is not None and not parser.can_fetch(get_session().headers["User-Agent"], url):
+        raise RobotsDisallowed(f"{url} exclue par robots.txt")
+
+def _fetch_once(url, meta, body, early_stop=True):
+    """
+    Une tentative de téléchargement (cf. fetch).
+    """
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    max_bytes = MAX_BODY_BYTES_BY_HOST.get(urlsplit(url).hostname, MAX_BODY_BYTES)
+    with _host_semaphore(url):
+        _throttle(url)
+        _check_deadline()
+        remaining = _remaining_time()
+        timeout = (min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining))
+        before = _stage_time("dns", "connect")
+        start = time.perf_counter()
+        resp = get_session().get(url, headers=headers, timeout=timeout, stream=True)
+        _add_stage("ttfb", time.perf_counter() - start - (_stage_time("dns", "connect") - before))
+        _set_metric("http_status", resp.status_code)
+        # Une réponse lue partiellement n'est pas remise dans le pool : close() libère la connexion
+        with resp:
+            if resp.status_code == 304 and meta is not None:
+                _set_metric("cache", "revalidated")
+                _refresh_cache_entry(url, meta, resp.headers)
+                if ARCHIVE_RESPONSES:
+                    _archive_cached(url, meta, body, "revalidated")
+                return body.decode(meta.get("encoding") or "utf-8", errors="replace")
+            resp.raise_for_status()
+            start = time.perf_counter()
+            content, encoding, truncated = _read_body(resp, max_bytes, early_stop)
+            _add_stage("download", time.perf_counter() - start)
+            _set_metric("bytes", resp.raw.tell())
+            _set_metric("body_bytes", len(content))
+            _set_metric("truncated", truncated)
+    if ARCHIVE_RESPONSES:
+        archive_response(url, resp.status_code, resp.reason, resp.headers, content, encoding, truncated)
+
+    # Un corps tronqué n'est pas mis en cache : la requête suivante reste inconditionnelle
+    if resp.status_code == 200 and not truncated:
+        _store_cache_entry(url, resp.headers, content, encoding)
+    return content.decode(encoding, errors="replace")
+
+def _fetch_with_retries(url, meta, body, early_stop=True):
+    """
+    Appelle _fetch_once en réessayant uniquement les erreurs transitoires
+    (connexion, délai dépassé, statuts RETRY_STATUSES), avec une attente exponentielle
+    aléatoire ("full jitter") qui ne dépasse jamais le budget de temps global.
+    Après un 429 ou un 503, c'est tout l'hôte qui attend (au moins la durée de son
+    en-tête Retry-After, cf. _throttle). Un 403, ou un 429 qui persiste, lève BlockedError.
+    """
+    for attempt in range(FETCH_RETRIES + 1):
+        status = None
+        try:
+            return _fetch_once(url, meta, body, early_stop)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            error = e
+        except requests.HTTPError as e:
+            error = e
+            status = e.response.status_code if e.response is not None else None
+            if status not in RETRY_STATUSES:
+                break
+        delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+        if status in (429, 503):
+            delay = max(delay, _retry_after(error.response) or 0)
+            _host_bucket(url).pause(delay)
+        if attempt == FETCH_RETRIES or delay > RETRY_AFTER_MAX or delay >= _remaining_time():
+            break
+        if status not in (429, 503):
+            time.sleep(delay)
+    if status in (403, 429):
+        reason = "accès refusé" if status == 403 else "trop de requêtes"
+        raise BlockedError(f"{reason} (HTTP {status}) : {url}", response=error.response) from error
+    raise error
+
+def fetch(url, early_stop=True):
+    """
+    Télécharge `url` via la session partagée, en respectant la limite de requêtes
+    simultanées par hôte, et retourne le HTML (str).
+    Une copie encore fraîche en cache est resservie sans requête ; sinon la requête
+    est conditionnelle (If-None-Match / If-Modified-Since) et un 304 réutilise le cache.
+    Le corps est lu en streaming et peut être tronqué (cf. _read_body ; `early_stop`
+    faux pour les pages de liste, dont tous les prix sont utiles, et avec --archive,
+    qui conserve les pages entières). Avec --archive, les copies servies par le cache
+    sont archivées aussi.
+    Les requêtes respectent le débit de l'hôte et son robots.txt (cf. _throttle,
+    _check_robots).
+    Lève une exception si le statut HTTP indique une erreur (BlockedError pour 403 / 429),
+    CircuitOpenError si l'hôte est en pause, RobotsDisallowed si robots.txt exclut l'URL,
+    DeadlineExceeded si le budget de temps global est épuisé.
+    """
+    meta, body = _load_cache_entry(url)
+    if meta is not None:
+        meta_path, _ = _cache_paths(url)
+        os.utime(meta_path)
+        if meta.get("fresh_until", 0) > time.time():
+            _set_metric("cache", "fresh")
+            if ARCHIVE_RESPONSES:
+                _archive_cached(url, meta, body, "fresh")
+            return body.decode(meta.get("encoding") or "utf-8", errors="replace")
+
+    _check_deadline()
+    host = urlsplit(url).hostname or ""
+    _acquire_circuit(host)
+    try:
+        _check_robots(url)
+        html = _fetch_with_retries(url, meta, body, early_stop and not ARCHIVE_RESPONSES)
+    except (CircuitOpenError, DeadlineExceeded, RobotsDisallowed):
+        _release_circuit(host, None)
+        raise
+    except BlockedError as e:
+        # Un 429 persistant est une pause demandée par l'hôte (cf. _throttle), pas une panne
+        throttled = e.response is not None and e.response.status_code == 429
+        _release_circuit(host, None if throttled or _remaining_time() <= 0 else False)
+        raise
+    except Exception:
+        # Un délai écourté par la fin du budget global n'est pas imputé à l'hôte
+        _release_circuit(host, False if _remaining_time() > 0 else None)
+        raise
+    _release_circuit(host, True)
+    return html
+
+# --- Archive des réponses (WARC) ---
+
+# En-têtes HTTP qui ne décrivent plus le corps archivé (décompressé, éventuellement tronqué)
+_ARCHIVE_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+def _archive_path(timestamp):
+    """
+    Fichier d'archive du jour (UTC) de `timestamp`.
+    """
+    extension = ".warc.zst" if zstandard is not None else ".warc.gz"
+    return os.path.join(ARCHIVE_DIR, time.strftime("%Y-%m-%d", time.gmtime(timestamp)) + extension)
+
+def _compress_record(path, data):
+    """
+    Compresse un enregistrement seul (trame zstd ou membre gzip indépendant) :
+    il peut être relu directement à sa position, et le fichier reste une simple
+    concaténation lisible par les outils WARC.
+    """
+    if path.endswith(".zst"):
+        return zstandard.ZstdCompressor(level=ARCHIVE_ZSTD_LEVEL).compress(data)
+    return gzip.compress(data)
+
+def _decompress_record(path, data):
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path} : le paquet zstandard est nécessaire pour relire l'archive")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+def archive_response(url, status, reason, headers, body, encoding, truncated=False, cache=None):
+    """
+    Ajoute une réponse à l'archive du jour : enregistrement WARC "response" (ligne de
+    statut, en-têtes et corps décompressé), compressé seul, et une ligne dans l'index
+    (<fichier>.idx : position, taille, URL, date, site, statut). `cache` ("fresh",
+    "revalidated") indique un corps resservi par le cache HTTP (cf. _archive_cached).
+    """
+    fetched_at = time.time()
+    date = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(fetched_at))
+    record = _current_metrics()
+    site = record["site"] if record is not None else None
+    http_headers = [(k, v) for k, v in headers.items() if k.lower() not in _ARCHIVE_SKIPPED_HEADERS]
+    http_headers.append(("Content-Length", str(len(body))))
+    block = (
+        f"HTTP/1.1 {status} {reason or ''}\r\n"
+        + "".join(f"{k}: {v}\r\n" for k, v in http_headers)
+        + "\r\n"
+    ).encode("utf-8") + body
+    warc_headers = [
+        ("WARC-Type", "response"),
+        ("WARC-Record-ID", f"<urn:uuid:{uuid.uuid4()}>"),
+        ("WARC-Date", date),
+        ("WARC-Target-URI", url),
+        ("Content-Type", "application/http;msgtype=response"),
+        ("WARC-Payload-Digest", "sha1:" + hashlib.sha1(body).hexdigest()),
+        ("WARC-Scrape-Encoding", encoding),
+    ]
+    if site:
+        warc_headers.append(("WARC-Scrape-Site", site))
+    if truncated:
+        warc_headers.append(("WARC-Truncated", "length"))
+    if cache:
+        warc_headers.append(("WARC-Scrape-Cache", cache))
+    warc_headers.append(("Content-Length", str(len(block))))
+    data = (
+        "WARC/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in warc_headers) + "\r\n"
+    ).encode("utf-8") + block + b"\r\n\r\n"
+
+    start = time.perf_counter()
+    path = _archive_path(fetched_at)
+    compressed = _compress_record(path, data)
+    entry = {"url": url, "date": int(fetched_at), "site": site, "status": status}
+    with _archive_lock:
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        # Ajout en une seule écriture O_APPEND : les lots lancés en parallèle sur
+        # la même machine (--local-shards) peuvent partager le fichier du jour
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, compressed)
+            offset = os.lseek(fd, 0, os.SEEK_CUR) - len(compressed)
+        finally:
+            os.close(fd)
+        entry.update(offset=offset, length=len(compressed))
+        fd = os.open(path + ".idx", os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+    _add_stage("archive", time.perf_counter() - start)
+
+def _archive_cached(url, meta, body, cache):
+    """
+    Archive le corps en cache de `url` resservi sans téléchargement (copie fraîche
+    ou 304), avec les en-têtes conservés dans son entrée `meta`.
+    """
+    headers = {"Content-Type": f"text/html; charset={meta.get('encoding') or 'utf-8'}"}
+    if meta.get("etag"):
+        headers["ETag"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["Last-Modified"] = meta["last_modified"]
+    archive_response(url, 200, "OK", headers, body, meta.get("encoding") or "utf-8", cache=cache)
+
+def read_archive_record(path, offset, length):
+    """
+    Relit l'enregistrement situé à `offset` dans le fichier d'archive `path`.
+    Retourne un dict {"url", "date", "site", "status", "headers", "body" (str)}.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = _decompress_record(path, f.read(length))
+    head, _, rest = data.partition(b"\r\n\r\n")
+    warc = dict(line.split(": ", 1) for line in head.decode("utf-8").split("\r\n")[1:])
+    block = rest[:int(warc["Content-Length"])]
+    http_head, _, body = block.partition(b"\r\n\r\n")
+    status_line, *header_lines = http_head.decode("utf-8", errors="replace").split("\r\n")
+    return {
+        "url": warc["WARC-Target-URI"],
+        "date": calendar.timegm(time.strptime(warc["WARC-Date"], "%Y-%m-%dT%H:%M:%SZ")),
+        "site": warc.get("WARC-Scrape-Site"),
+        "status": int(status_line.split()[1]),
+        "headers": dict(line.split(": ", 1) for line in header_lines if ": " in line),
+        "body": body.decode(warc.get("WARC-Scrape-Encoding") or "utf-8", errors="replace"),
     }
-    .offer a {
-      color: #0072E5; 
-      text-decoration: none;
+
+def archive_index(paths):
+    """
+    Entrées de l'index des fichiers d'archive `paths` (cf. archive_response),
+    complétées du chemin du fichier ("path").
+    """
+    entries = []
+    for path in paths:
+        with open(path + ".idx", "r", encoding="utf-8") as f:
+            entries.extend(dict(json.loads(line), path=path) for line in f if line.strip())
+    return entries
+
+# --- Empreintes de contenu ---
+
+def normalize_html(html):
+    """
+    Retire du HTML ce qui change d'un téléchargement à l'autre sans changer l'offre :
+    scripts (sauf JSON-LD), styles, commentaires, jetons CSRF / nonces, horodatages.
+    """
+    for pattern, replacement in _NORMALIZE_PATTERNS:
+        html = pattern.sub(replacement, html)
+    return html
+
+def content_fingerprint(html):
+    """
+    Empreinte (sha256) du contenu normalisé d'une page.
+    """
+    return hashlib.sha256(normalize_html(html).encode("utf-8")).hexdigest()
+
+def _state_path(name):
+    """
+    Chemin d'un fichier d'état conservé entre deux exécutions.
+    """
+    return os.path.join(STATE_DIR, name)
+
+def _load_fingerprints():
+    """
+    Charge (une seule fois par exécution) les empreintes et résultats d'extraction
+    de l'exécution précédente. Les résultats d'une autre version de l'extraction, ou
+    d'un autre catalogue (y compris après un rechargement, cf. set_catalog), sont ignorés.
+    """
+    global _fingerprints
+    # Les résultats dépendent aussi du catalogue des produits suivis
+    version = f"{EXTRACTION_VERSION}-{get_catalog().digest}"
+    with _fingerprints_lock:
+        if _fingerprints is None:
+            try:
+                with open(_state_path(FINGERPRINTS_FILE), "r", encoding="utf-8") as f:
+                    _fingerprints = json.load(f)
+            except (OSError, ValueError):
+                _fingerprints = {}
+        if _fingerprints.get("version") != version:
+            _fingerprints = {"version": version, "pages": {}}
+        return _fingerprints
+
+def save_fingerprints():
+    """
+    Enregistre les empreintes de l'exécution courante pour la suivante.
+    """
+    with _fingerprints_lock:
+        if _fingerprints is None:
+            return
+        data = json.dumps(_fingerprints, ensure_ascii=False, sort_keys=True)
+    _write_atomic(_state_path(FINGERPRINTS_FILE), data.encode("utf-8"))
+
+# --- Extraction ---
+
+def _to_price(value):
+    """
+    Convertit un prix issu de données structurées ("170.00", 170, "1 234,56") en float.
+    """
+    if isinstance(value, (int, float)):
+        return float(value) if value > 0 else None
+    if not isinstance(value, str):
+        return None
+    value = value.replace("\u00a0", "").replace(" ", "")
+    if "," in value and "." in value:
+        # Le dernier séparateur est le séparateur décimal
+        if value.rfind(",") > value.rfind("."):
+            value = value.replace(".", "").replace(",", ".")
+        else:
+            value = value.replace(",", "")
+    else:
+        value = value.replace(",", ".")
+    try:
+        price = float(value)
+    except ValueError:
+        return None
+    return price if price > 0 else None
+
+def _jsonld_products(node, brand=None):
+    """
+    Parcourt un document JSON-LD et retourne les paires (objet Product / ProductGroup,
+    marque) y compris dans @graph et dans les variantes hasVariant, qui héritent
+    de la marque de leur groupe.
+    """
+    if isinstance(node, list):
+        for item in node:
+            yield from _jsonld_products(item, brand)
+    elif isinstance(node, dict):
+        own_brand = node.get("brand")
+        if isinstance(own_brand, dict):
+            own_brand = own_brand.get("name")
+        brand = own_brand if isinstance(own_brand, str) else brand
+        types = node.get("@type")
+        types = types if isinstance(types, list) else [types]
+        if "Product" in types or "ProductGroup" in types:
+            yield node, brand
+        for key in ("@graph", "hasVariant", "mainEntity", "itemListElement", "item"):
+            if key in node:
+                yield from _jsonld_products(node[key], brand)
+
+def _jsonld_offers(product):
+    """
+    Retourne les offres (Offer / AggregateOffer) d'un objet Product JSON-LD.
+    """
+    offers = product.get("offers") or []
+    offers = offers if isinstance(offers, list) else [offers]
+    for offer in offers:
+        if not isinstance(offer, dict):
+            continue
+        nested = offer.get("offers")
+        if isinstance(nested, (list, dict)):
+            yield from _jsonld_offers(offer)
+        else:
+            yield offer
+
+class _SoupDocument:
+    """
+    Page analysée par BeautifulSoup (analyseur "html.parser" ou "lxml").
+    """
+
+    def __init__(self, html, features):
+        self.soup = BeautifulSoup(html, features)
+
+    def ldjson_blocks(self):
+        return [script.string or "" for script in self.soup.find_all("script", type="application/ld+json")]
+
+    def first(self, attr, value):
+        """
+        Attribut content (ou à défaut texte) du premier élément tel que attr=value, ou None.
+        """
+        tag = self.soup.find(attrs={attr: value})
+        if tag is None:
+            return None
+        return tag.get("content") or tag.get_text(" ", strip=True)
+
+    def text(self):
+        return self.soup.get_text(separator=" ")
+
+    def select(self, selector):
+        """
+        (texte, href du premier lien) de chaque élément correspondant au sélecteur CSS.
+        """
+        results = []
+        for tag in self.soup.select(selector):
+            link = tag if tag.name == "a" and tag.get("href") else tag.find("a", href=True)
+            results.append((tag.get_text(" ", strip=True), link.get("href") if link else None))
+        return results
+
+    def href(self, selector):
+        """
+        Attribut href du premier élément correspondant au sélecteur CSS, ou None.
+        """
+        tag = self.soup.select_one(selector)
+        return tag.get("href") if tag is not None else None
+
+    def node_count(self):
+        return len(self.soup.find_all(True))
+
+    def texts(self, selector):
+        """
+        Texte de chaque élément correspondant au sélecteur CSS.
+        """
+        return [tag.get_text(" ", strip=True) for tag in self.soup.select(selector)]
+
+    def currency_nodes(self, needles):
+        """
+        Éléments dont le texte propre contient l'un des littéraux `needles`
+        (hors scripts, styles et commentaires), dans l'ordre du document.
+        """
+        nodes = []
+        for string in self.soup.find_all(string=lambda s: any(n in s for n in needles)):
+            parent = string.parent
+            if type(string) is NavigableString and parent is not None and (not nodes or nodes[-1] is not parent):
+                nodes.append(parent)
+        return nodes
+
+    def parent(self, node):
+        """
+        Élément parent de `node`, ou None au-delà de <body>.
+        """
+        parent = node.parent
+        return parent if parent is not None and parent.name not in ("html", "[document]") else None
+
+    def node_text(self, node):
+        return node.get_text(" ", strip=True)
+
+    def node_info(self, node):
+        """
+        (balise, id, classes) de `node`.
+        """
+        return node.name, node.get("id"), node.get("class") or []
+
+class _LexborDocument:
+    """
+    Page analysée par selectolax (moteur Lexbor, en C), même interface que _SoupDocument.
+    """
+
+    def __init__(self, html):
+        from selectolax.lexbor import LexborHTMLParser
+        self.tree = LexborHTMLParser(html)
+
+    def ldjson_blocks(self):
+        return [node.text(deep=True) for node in self.tree.css('script[type="application/ld+json"]')]
+
+    def first(self, attr, value):
+        node = self.tree.css_first(f'[{attr}="{value}"]')
+        if node is None:
+            return None
+        return node.attributes.get("content") or node.text(separator=" ", strip=True)
+
+    def select(self, selector):
+        results = []
+        for node in self.tree.css(selector):
+            link = node if node.tag == "a" and node.attributes.get("href") else node.css_first("a[href]")
+            results.append((node.text(separator=" ", strip=True), link.attributes.get("href") if link else None))
+        return results
+
+    def href(self, selector):
+        node = self.tree.css_first(selector)
+        return node.attributes.get("href") if node is not None else None
+
+    def _strip_scripts(self):
+        # Comme get_text de BeautifulSoup : sans le contenu des scripts et styles
+        if not getattr(self, "_stripped", False):
+            self.tree.strip_tags(["script", "style", "template"])
+            self._stripped = True
+
+    def text(self):
+        self._strip_scripts()
+        return self.tree.root.text(separator=" ") if self.tree.root is not None else ""
+
+    def node_count(self):
+        return len(self.tree.css("*"))
+
+    def texts(self, selector):
+        self._strip_scripts()
+        return [node.text(separator=" ", strip=True) for node in self.tree.css(selector)]
+
+    def currency_nodes(self, needles):
+        self._strip_scripts()
+        return [node for node in self.tree.css("body *") if any(n in node.text(deep=False) for n in needles)]
+
+    def parent(self, node):
+        parent = node.parent
+        return parent if parent is not None and parent.tag not in ("html", "-document") else None
+
+    def node_text(self, node):
+        return node.text(separator=" ", strip=True)
+
+    def node_info(self, node):
+        attributes = node.attributes
+        return node.tag, attributes.get("id"), (attributes.get("class") or "").split()
+
+def _backend_available(backend):
+    """
+    Indique si l'analyseur HTML `backend` est installé.
+    """
+    module = {"lxml": "lxml", "selectolax": "selectolax.lexbor"}.get(backend)
+    if module is None:
+        return backend == "html.parser"
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        return False
+    return True
+
+def resolve_parser_backend(backend=None):
+    """
+    Analyseur HTML effectivement utilisé : "auto" choisit le plus rapide des
+    analyseurs installés (selectolax, puis lxml, puis html.parser en pur Python).
+    """
+    backend = backend or PARSER_BACKEND
+    if backend == "auto":
+        return next(b for b in ("selectolax", "lxml", "html.parser") if _backend_available(b))
+    if not _backend_available(backend):
+        raise ValueError(f"analyseur HTML indisponible : {backend}")
+    return backend
+
+def parse_document(html, backend=None):
+    """
+    Analyse `html` avec l'analyseur choisi (cf. resolve_parser_backend).
+    """
+    backend = resolve_parser_backend(backend)
+    if backend == "selectolax":
+        return _LexborDocument(html)
+    return _SoupDocument(html, backend)
+
+def extract_structured_offers(doc):
+    """
+    Lit les prix publiés sous forme de données structurées, sans extraire le texte
+    de la page : blocs JSON-LD Product/Offer, microdata itemprop="price",
+    balises meta product:price:amount.
+
+    Retourne une liste de dicts {"text", "price", "currency"} où "text" regroupe
+    le nom, la marque et la contenance du produit concerné (plus "url", le lien
+    de la fiche produit, pour les blocs JSON-LD).
+    """
+    offers = []
+
+    for block in doc.ldjson_blocks():
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        for product, brand in _jsonld_products(data):
+            for offer in _jsonld_offers(product):
+                price = offer.get("price")
+                if price is None:
+                    price = offer.get("lowPrice")
+                if price is None and isinstance(offer.get("priceSpecification"), dict):
+                    price = offer["priceSpecification"].get("price")
+                parts = [product.get("name"), brand, product.get("size"), offer.get("name")]
+                offers.append({
+                    "text": " ".join(str(p) for p in parts if isinstance(p, str)),
+                    "price": _to_price(price),
+                    "currency": offer.get("priceCurrency"),
+                    "url": offer.get("url") or product.get("url"),
+                })
+
+    price = doc.first("itemprop", "price")
+    if price is not None:
+        parts = [doc.first("itemprop", "name"), doc.first("itemprop", "brand")]
+        offers.append({
+            "text": " ".join(p for p in parts if p),
+            "price": _to_price(price),
+            "currency": doc.first("itemprop", "priceCurrency"),
+        })
+
+    amount = doc.first("property", "product:price:amount")
+    if amount is not None:
+        parts = [doc.first("property", "og:title"), doc.first("property", "product:brand")]
+        offers.append({
+            "text": " ".join(p for p in parts if p),
+            "price": _to_price(amount),
+            "currency": doc.first("property", "product:price:currency"),
+        })
+
+    return offers
+
+def _match_product(text, prices=None):
+    """
+    Cherche dans `text` le produit du catalogue concerné (nom, contenance, absence
+    des termes d'exclusion) et le premier prix dans l'une de ses devises de référence
+    (une seule passe sur le texte). `prices` ({devise: prix}) remplace les prix
+    trouvés dans le texte (données structurées).
+    """
+    return _page_from_scan(scan_text(text), prices)
+
+def _page_from_scan(scan, prices=None):
+    """
+    Résultat de _match_product à partir du résultat de scan_text.
+    """
+    product, brand = get_catalog().match(scan)
+    page = {
+        "sku": None,
+        "product": None,
+        "brand": brand,
+        "size": None,
+        "currency": None,
+        "reference_price": 0,
+        "threshold": None,
+        "price": None,
+        "source": None,
     }
-    .offer a:hover {
-      text-decoration: underline;
+    if product is None:
+        return page
+    page.update({
+        "sku": product["sku"],
+        "product": f"{product['name']} {product['size']}",
+        "size": product["size"],
+        "threshold": product["threshold"],
+    })
+    prices = scan["prices"] if prices is None else prices
+    for currency, reference_price in product["reference_prices"].items():
+        if prices.get(currency) is not None:
+            page.update({"currency": currency, "reference_price": reference_price, "price": prices[currency]})
+            break
+    return page
+
+def _analyze(html, backend=None, location=None):
+    """
+    Analyse une page produit et retourne (résultat, mesures) : cf. analyze_page.
+    `location` est le bloc produit appris pour l'hôte (cf. _extract_from_document) ;
+    les mesures contiennent celui à conserver ("location") et son usage ("located").
+    Exécutée dans les processus d'analyse lorsqu'ils sont activés.
+    """
+    start = time.perf_counter()
+    doc = parse_document(html, backend)
+    stats = {"parse": time.perf_counter() - start, "nodes": doc.node_count()}
+
+    start = time.perf_counter()
+    page, stats["location"] = _extract_from_document(doc, location)
+    stats["extract"] = time.perf_counter() - start
+    if page["source"] == "located":
+        stats["located"] = "hit"
+    elif stats["location"] is not None:
+        stats["located"] = "learned"
+    elif location is not None:
+        stats["located"] = "miss"
+    return page, stats
+
+def _record_parse_stats(stats):
+    """
+    Reporte les mesures d'analyse (éventuellement faites dans un autre processus)
+    sur l'invocation en cours.
+    """
+    _add_stage("parse", stats["parse"])
+    _add_stage("extract", stats["extract"])
+    _set_metric("nodes", stats["nodes"])
+    if stats.get("located"):
+        _set_metric("located", stats["located"])
+
+def analyze_page(html):
+    """
+    Analyse une page produit et retourne les éléments utiles au filtrage :
+    produit du catalogue reconnu, mention de sa marque, contenance,
+    prix de référence, seuil de réduction et prix trouvé.
+
+    Les données structurées (JSON-LD, microdata, meta) sont lues en premier ;
+    le texte complet de la page n'est extrait que si elles ne donnent pas
+    un prix, dans une devise de référence, pour un produit du catalogue.
+    """
+    page, stats = _analyze(html)
+    _record_parse_stats(stats)
+    return page
+
+def _extract_from_document(doc, location=None):
+    """
+    Extraction sur un document déjà analysé (cf. analyze_page). Sans données
+    structurées, seul le bloc produit `location` appris pour l'hôte est lu s'il donne
+    encore un produit et un prix ; sinon tout le texte de la page est parcouru et
+    le bloc est appris de nouveau (cf. _learn_location).
+    Retourne (résultat, bloc produit à conserver pour l'hôte ou None).
+    """
+    page = _structured_page(doc)
+    if page is not None:
+        return page, location
+
+    if location is not None:
+        page = _match_location(doc, location)
+        if page is not None:
+            page["source"] = "located"
+            return page, location
+
+    text = doc.text()
+    page = _match_product(text)
+    page["source"] = "text"
+    learned = None
+    if page["sku"] and page["price"] is not None:
+        learned = _learn_location(doc, page, len(text))
+    return page, learned
+
+def _structured_page(doc):
+    """
+    Résultat (cf. _match_product) de la première offre des données structurées de `doc`
+    qui désigne un produit du catalogue avec sa marque et un prix, ou None.
+    """
+    for offer in extract_structured_offers(doc):
+        if offer["price"] is None or not offer["currency"]:
+            continue
+        page = _match_product(offer["text"], prices={offer["currency"].upper(): offer["price"]})
+        if page["brand"] and page["price"] is not None:
+            page["source"] = "structured"
+            return page
+    return None
+
+# Classes et identifiants générés (hachages, numéros), qui changent d'une version du site à l'autre
+_CSS_IDENTIFIER = re.compile(r"^-?[A-Za-z_][\w-]*$")
+_VOLATILE_IDENTIFIER = re.compile(r"\d{3,}|^(?:css|sc|jsx|svelte)-")
+
+def _node_selector(doc, node):
+    """
+    Sélecteur CSS de `node` : chaîne de ses ancêtres (balise et classes stables)
+    jusqu'au premier qui a un identifiant stable.
+    """
+    parts = []
+    while node is not None:
+        tag, node_id, classes = doc.node_info(node)
+        if node_id and _CSS_IDENTIFIER.match(node_id) and not _VOLATILE_IDENTIFIER.search(node_id):
+            parts.append(f"{tag}#{node_id}")
+            break
+        stable = [c for c in classes if _CSS_IDENTIFIER.match(c) and not _VOLATILE_IDENTIFIER.search(c)]
+        parts.append(tag + "".join("." + c for c in stable))
+        node = doc.parent(node)
+    return " > ".join(reversed(parts))
+
+def _match_location(doc, location):
+    """
+    Résultat (cf. _match_product) du premier élément du bloc `location` qui donne
+    un produit du catalogue et un prix (et la marque, si elle y figurait lors de
+    l'apprentissage), ou None si le bloc a disparu ou ne convient plus.
+    """
+    for text in doc.texts(location["selector"]):
+        page = _match_product(text)
+        if page["sku"] and page["price"] is not None and (page["brand"] or not location["brand"]):
+            return page
+    return None
+
+def _learn_location(doc, page, text_length):
+    """
+    Cherche le plus petit bloc de la page qui donne le même résultat que le texte
+    complet (`page`) : en partant des éléments qui portent un symbole de la devise
+    du prix, remonte les ancêtres tant que le bloc reste une partie de la page
+    (LOCATION_MAX_SHARE). Retourne {"selector", "brand"} ou None.
+    """
+    needles = [anchor for anchor, kind in _ANCHORS.items()
+               if kind == page["currency"] or (kind == "$" and page["currency"] in ("USD", "AUD"))]
+    keys = ("sku", "price", "currency", "brand")
+    for node in doc.currency_nodes(needles)[:LOCATION_MAX_CANDIDATES]:
+        while node is not None:
+            text = doc.node_text(node)
+            if len(text) > text_length * LOCATION_MAX_SHARE:
+                break
+            block = _match_product(text)
+            if all(block[k] == page[k] for k in keys):
+                location = {"selector": _node_selector(doc, node), "brand": bool(page["brand"])}
+                located = _match_location(doc, location)
+                if located is not None and all(located[k] == page[k] for k in keys):
+                    return location
+                break
+            node = doc.parent(node)
+    return None
+
+def extract_listing_tiles(doc, tile_selector=None):
+    """
+    Relève les vignettes d'une page de liste (catégorie, recherche, collection) qui
+    concernent un produit du catalogue. Les données structurées (JSON-LD ItemList /
+    Product avec leur url) sont préférées ; à défaut, les vignettes HTML sont celles
+    du sélecteur CSS `tile_selector` (LISTING_TILE_SELECTOR par défaut).
+
+    Retourne une liste de dicts {"url" (lien de la fiche, relatif ou non), "page"
+    (cf. _match_product), "follow"} : "follow" indique que la vignette mentionne
+    un produit du catalogue sans contenance ou sans prix, et que la fiche produit
+    doit être téléchargée.
+    """
+    candidates = [
+        (offer["text"], offer["url"], {offer["currency"].upper(): offer["price"]})
+        for offer in extract_structured_offers(doc)
+        if offer.get("url") and offer["price"] is not None and offer["currency"]
+    ]
+    if not candidates:
+        candidates = [(text, link, None) for text, link in doc.select(tile_selector or LISTING_TILE_SELECTOR) if link]
+
+    catalog = get_catalog()
+    tiles = {}
+    for text, link, prices in candidates:
+        scan = scan_text(text)
+        page = _page_from_scan(scan, prices)
+        follow = page["price"] is None and catalog.mentions(scan)
+        if (page["sku"] or follow) and link not in tiles:
+            page["source"] = "listing"
+            tiles[link] = {"url": link, "page": page, "follow": follow}
+    return list(tiles.values())
+
+def _analyze_listing(html, backend=None, tile_selector=None):
+    """
+    Analyse une page de liste et retourne ({"tiles", "next"}, mesures) :
+    vignettes (cf. extract_listing_tiles) et lien de la page suivante (ou None).
+    """
+    start = time.perf_counter()
+    doc = parse_document(html, backend)
+    stats = {"parse": time.perf_counter() - start, "nodes": doc.node_count()}
+
+    start = time.perf_counter()
+    listing = {"tiles": extract_listing_tiles(doc, tile_selector), "next": doc.href(LISTING_NEXT_SELECTOR)}
+    stats["extract"] = time.perf_counter() - start
+    return listing, stats
+
+# --- Adaptateurs JSON ---
+# Shopify publie chaque fiche et chaque collection en JSON (variantes, prix) ; les
+# vitrines Next.js et assimilées embarquent leur état (produits, prix) dans la page.
+# Ces données sont lues sans analyse DOM.
+
+_NEXT_DATA = re.compile(r"<script\b[^>]*\bid=[\"']__NEXT_DATA__[\"'][^>]*>(.*?)</script\s*>", re.I | re.S)
+_INITIAL_STATE = re.compile(r"window\.__(?:INITIAL|PRELOADED)_STATE__\s*=\s*")
+_STATE_NAME_KEYS = ("name", "title", "productName", "displayName")
+_STATE_DETAIL_KEYS = ("brand", "vendor", "size", "volume", "variantName", "option1")
+_STATE_PRICE_KEYS = ("price", "salePrice", "currentPrice", "finalPrice", "sellingPrice")
+_STATE_CURRENCY_KEYS = ("currency", "currencyCode", "priceCurrency")
+
+def detect_adapter(html):
+    """
+    Adaptateur JSON utilisable pour une page HTML déjà téléchargée, d'après
+    les marqueurs de la plateforme : "shopify", "next_data" ou None.
+    """
+    if "cdn.shopify.com" in html or "Shopify.shop" in html:
+        return "shopify"
+    if "__NEXT_DATA__" in html or _INITIAL_STATE.search(html):
+        return "next_data"
+    return None
+
+def shopify_json_url(url, listing=False, page=1):
+    """
+    Point d'accès JSON Shopify d'une fiche (/products/<handle>.json) ou d'une
+    collection (/collections/<handle>/products.json, page `page`).
+    """
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/")
+    if listing:
+        return urlunsplit((parts.scheme, parts.netloc, path + "/products.json",
+                           f"limit={SHOPIFY_PAGE_SIZE}&page={page}", ""))
+    return urlunsplit((parts.scheme, parts.netloc, path + ".json", "", ""))
+
+def shopify_variant_pages(products, url, currency=None):
+    """
+    Un résultat {"url", "page"} (cf. _match_product) par variante disponible des
+    produits Shopify `products` qui correspond à un produit du catalogue.
+    `url` est celle de la fiche ou de la collection d'où viennent les produits.
+    """
+    currency = (currency or JSON_DEFAULT_CURRENCY).upper()
+    results = []
+    for product in products:
+        if "/products/" in urlsplit(url).path:
+            base = url.split("?")[0]
+        else:
+            base = urljoin(url.rstrip("/") + "/", f"products/{product.get('handle', '')}")
+        for variant in product.get("variants") or []:
+            if variant.get("available") is False:
+                continue
+            parts = [product.get("vendor"), product.get("title"), variant.get("title")]
+            text = " ".join(p for p in parts if isinstance(p, str))
+            page = _match_product(text, prices={currency: _to_price(variant.get("price"))})
+            if page["sku"]:
+                page["source"] = "shopify"
+                results.append({"url": f"{base}?variant={variant.get('id')}", "page": page})
+    return results
+
+def embedded_states(html):
+    """
+    États JSON embarqués dans la page (script __NEXT_DATA__, window.__INITIAL_STATE__),
+    lus sans analyse DOM.
+    """
+    states = []
+    for match in _NEXT_DATA.finditer(html):
+        try:
+            states.append(json.loads(match.group(1)))
+        except ValueError:
+            pass
+    decoder = json.JSONDecoder()
+    for match in _INITIAL_STATE.finditer(html):
+        try:
+            states.append(decoder.raw_decode(html, match.end())[0])
+        except ValueError:
+            pass
+    return states
+
+def _state_price(value):
+    """
+    (prix, devise ou None) d'une valeur de prix d'un état JSON : nombre, chaîne,
+    ou objet {"value" | "amount" | "centAmount", "currency" | "currencyCode"}.
+    """
+    if isinstance(value, dict):
+        currency = next((value[k] for k in _STATE_CURRENCY_KEYS if isinstance(value.get(k), str)), None)
+        if "centAmount" in value and isinstance(value["centAmount"], (int, float)):
+            return _to_price(value["centAmount"] / 10 ** value.get("fractionDigits", 2)), currency
+        for key in ("value", "amount", "current"):
+            if key in value:
+                return _state_price(value[key])[0], currency
+        return None, currency
+    return _to_price(value), None
+
+def _state_offers(node, context="", currency=None):
+    """
+    Parcourt un état JSON et retourne les triplets (texte, prix, devise) des objets
+    portant un prix. Le texte regroupe le nom et les détails (marque, contenance)
+    de l'objet et de l'objet parent (ex. produit d'une variante).
+    """
+    if isinstance(node, list):
+        for item in node:
+            yield from _state_offers(item, context, currency)
+        return
+    if not isinstance(node, dict):
+        return
+    parts = []
+    for key in _STATE_NAME_KEYS + _STATE_DETAIL_KEYS:
+        value = node.get(key)
+        if isinstance(value, dict):
+            value = value.get("name")
+        if isinstance(value, str):
+            parts.append(value)
+    own = " ".join(parts)
+    currency = next((node[k] for k in _STATE_CURRENCY_KEYS if isinstance(node.get(k), str)), currency)
+    for key in _STATE_PRICE_KEYS:
+        if key in node:
+            price, price_currency = _state_price(node[key])
+            if price is not None:
+                yield f"{context} {own}".strip(), price, price_currency or currency
+                break
+    for value in node.values():
+        if isinstance(value, (dict, list)):
+            yield from _state_offers(value, own or context, currency)
+
+def embedded_state_pages(html, currency=None):
+    """
+    Un résultat {"url": None, "page"} par produit du catalogue trouvé dans les états
+    JSON embarqués de la page (le premier prix relevé pour chaque produit).
+    """
+    results = {}
+    for state in embedded_states(html):
+        for text, price, offer_currency in _state_offers(state):
+            offer_currency = (offer_currency or currency or JSON_DEFAULT_CURRENCY).upper()
+            page = _match_product(text, prices={offer_currency: price})
+            if page["sku"] and page["sku"] not in results:
+                page["source"] = "next_data"
+                results[page["sku"]] = {"url": None, "page": page}
+    return list(results.values())
+
+def _load_adapters():
+    """
+    Charge (une seule fois par exécution) les adaptateurs détectés par hôte.
+    """
+    global _adapters
+    with _adapters_lock:
+        if _adapters is None:
+            try:
+                with open(_state_path(ADAPTERS_FILE), "r", encoding="utf-8") as f:
+                    _adapters = json.load(f)
+            except (OSError, ValueError):
+                _adapters = {}
+    return _adapters
+
+def save_adapters():
+    """
+    Enregistre les adaptateurs détectés pour l'exécution suivante.
+    """
+    with _adapters_lock:
+        if _adapters is None:
+            return
+        data = json.dumps(_adapters, sort_keys=True)
+    _write_atomic(_state_path(ADAPTERS_FILE), data.encode("utf-8"))
+
+def adapter_for(url, adapter=None):
+    """
+    Adaptateur à utiliser pour `url` : celui configuré pour le site, sinon celui
+    détecté lors d'une exécution précédente (None si l'hôte n'a pas encore été vu).
+    """
+    if adapter:
+        return adapter
+    adapters = _load_adapters()
+    with _adapters_lock:
+        return adapters.get(urlsplit(url).hostname or "")
+
+def remember_adapter(url, adapter):
+    """
+    Mémorise l'adaptateur détecté (ou "html") pour l'hôte de `url`.
+    """
+    adapters = _load_adapters()
+    with _adapters_lock:
+        adapters[urlsplit(url).hostname or ""] = adapter
+
+# --- Analyse dans des processus dédiés ---
+
+def start_parse_pool(workers=None):
+    """
+    Démarre les processus d'analyse HTML (PARSE_WORKERS par défaut ; 0 = analyse
+    dans les threads de téléchargement). À appeler avant de lancer les téléchargements.
+    """
+    global _parse_pool, _parse_slots
+    workers = PARSE_WORKERS if workers is None else workers
+    if workers <= 0 or _parse_pool is not None:
+        return
+    _parse_pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=set_catalog, initargs=(get_catalog().data,),
+    )
+    _parse_slots = threading.BoundedSemaphore(PARSE_QUEUE_SIZE or 2 * workers)
+    # Démarre les processus tout de suite plutôt qu'au premier envoi
+    list(_parse_pool.map(resolve_parser_backend, [PARSER_BACKEND] * workers))
+
+def stop_parse_pool():
+    """
+    Arrête les processus d'analyse (les analyses en attente sont abandonnées).
+    """
+    global _parse_pool, _parse_slots
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=True, cancel_futures=True)
+    _parse_pool = None
+    _parse_slots = None
+
+def _parse_timeout():
+    """
+    Attente maximale d'une analyse : le temps restant de l'exécution (None si illimité).
+    """
+    remaining = _remaining_time()
+    return None if remaining == float("inf") else max(0, remaining)
+
+def _load_locations():
+    """
+    Charge (une seule fois par exécution) les blocs produit appris, par hôte.
+    """
+    global _locations
+    with _locations_lock:
+        if _locations is None:
+            try:
+                with open(_state_path(LOCATIONS_FILE), "r", encoding="utf-8") as f:
+                    _locations = json.load(f)
+            except (OSError, ValueError):
+                _locations = {}
+    return _locations
+
+def save_locations():
+    """
+    Enregistre les blocs produit appris pour les exécutions suivantes.
+    """
+    with _locations_lock:
+        if _locations is None:
+            return
+        data = json.dumps(_locations, ensure_ascii=False, sort_keys=True)
+    _write_atomic(_state_path(LOCATIONS_FILE), data.encode("utf-8"))
+
+def analyze_in_pool(analyzer, html, *args):
+    """
+    Appelle analyzer(html, PARSER_BACKEND, *args) (_analyze ou _analyze_listing) dans
+    un processus d'analyse si le pool est démarré, sinon dans le thread courant.
+    Le nombre de pages en attente d'analyse est borné (PARSE_QUEUE_SIZE) : au-delà,
+    les threads de téléchargement patientent, ce qui limite la mémoire occupée.
+    Retourne (résultat, mesures).
+    """
+    pool, slots = _parse_pool, _parse_slots
+    if pool is None:
+        page, stats = analyzer(html, PARSER_BACKEND, *args)
+        _record_parse_stats(stats)
+        return page, stats
+    if not slots.acquire(timeout=_parse_timeout()):
+        raise DeadlineExceeded("budget de temps de l'exécution épuisé")
+    try:
+        future = pool.submit(analyzer, html, PARSER_BACKEND, *args)
+        try:
+            page, stats = future.result(timeout=_parse_timeout())
+        except FuturesTimeoutError:
+            future.cancel()
+            raise DeadlineExceeded("budget de temps de l'exécution épuisé")
+    finally:
+        slots.release()
+    _record_parse_stats(stats)
+    return page, stats
+
+def analyze_page_cached(url, html, listing=False, tile_selector=None):
+    """
+    Comme analyze_page (ou, avec `listing`, comme _analyze_listing), mais réutilise
+    le résultat précédent de `url` si le contenu normalisé de la page n'a pas changé
+    (aucun parsing dans ce cas). Le bloc produit appris pour l'hôte (LOCATIONS_FILE)
+    est utilisé puis mis à jour.
+    """
+    key = f"listing {tile_selector or ''} {url}" if listing else url
+    record = _current_metrics()
+    # Page tronquée (cf. _read_body) : ni comparée ni mémorisée comme une page complète
+    truncated = record is not None and record.get("truncated")
+    pages = _load_fingerprints()["pages"]
+    if not truncated:
+        start = time.perf_counter()
+        fingerprint = content_fingerprint(html)
+        _add_stage("fingerprint", time.perf_counter() - start)
+        with _fingerprints_lock:
+            previous = pages.get(key)
+        if previous and previous["fingerprint"] == fingerprint:
+            _set_metric("fingerprint_hit", True)
+            return previous["result"]
+
+    if listing:
+        result, _ = analyze_in_pool(_analyze_listing, html, tile_selector)
+    else:
+        host = urlsplit(url).hostname or ""
+        locations = _load_locations()
+        with _locations_lock:
+            location = locations.get(host)
+        result, stats = analyze_in_pool(_analyze, html, location)
+        if stats["location"] != location:
+            with _locations_lock:
+                if stats["location"] is None:
+                    locations.pop(host, None)
+                else:
+                    locations[host] = stats["location"]
+    if not truncated:
+        with _fingerprints_lock:
+            pages[key] = {"fingerprint": fingerprint, "result": result}
+    return result
+
+# --- Évaluation des réductions ---
+
+def evaluate_discounts(observations):
+    """
+    Renseigne `is_offer` pour toutes les observations d'une exécution en une seule
+    passe vectorisée (NumPy s'il est installé, sinon check_discount sur chaque
+    observation) : réduction >= seuil du produit par rapport à son prix de référence.
+    """
+    priced = [o for o in observations if o["status"] == "ok"]
+    if not priced:
+        return observations
+    if np is not None:
+        prices = np.fromiter((o["current_price"] for o in priced), dtype=float, count=len(priced))
+        references = np.fromiter((o["reference_price"] for o in priced), dtype=float, count=len(priced))
+        thresholds = np.fromiter((o["threshold"] for o in priced), dtype=float, count=len(priced))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            flags = (references != 0) & ((1 - prices / references) * 100 >= thresholds)
+        flags = flags.tolist()
+    else:
+        flags = [check_discount(o["current_price"], o["reference_price"], o["threshold"]) for o in priced]
+    for observation, flag in zip(priced, flags):
+        observation["is_offer"] = flag
+    return observations
+
+# --- Historique des prix ---
+
+def _connect_store(path=None):
+    """
+    Ouvre (et crée si besoin) la base SQLite de l'historique des prix.
+    """
+    path = path or _state_path(PRICES_DB)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS observations (
+            id INTEGER PRIMARY KEY,
+            observed_at INTEGER NOT NULL,
+            site TEXT NOT NULL,
+            url TEXT NOT NULL,
+            size TEXT,
+            price REAL,
+            currency TEXT,
+            status TEXT NOT NULL,
+            sku TEXT
+        );
+        CREATE INDEX IF NOT EXISTS observations_by_site
+            ON observations (site, observed_at);
+        CREATE INDEX IF NOT EXISTS observations_by_size
+            ON observations (size, currency, observed_at, price);
+    """)
+    # Bases créées avant le catalogue de produits
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(observations)")}
+    if "sku" not in columns:
+        conn.execute("ALTER TABLE observations ADD COLUMN sku TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS observations_by_sku ON observations (sku, currency, observed_at, price)")
+    return conn
+
+def record_observations(observations, path=None):
+    """
+    Ajoute les observations à l'historique au fil de l'itérable `observations`
+    (liste ou générateur), par transactions de STORE_BATCH_SIZE observations.
+    """
+    conn = _connect_store(path)
+    try:
+        rows = []
+        for o in observations:
+            rows.append((o["observed_at"], o["site"], o["url"], o["sku"], o["size"],
+                         o["current_price"], o["currency"], o["status"]))
+            if len(rows) >= STORE_BATCH_SIZE:
+                _insert_observations(conn, rows)
+                rows = []
+        if rows:
+            _insert_observations(conn, rows)
+    finally:
+        conn.close()
+
+def _insert_observations(conn, rows):
+    with conn:
+        conn.executemany(
+            "INSERT INTO observations (observed_at, site, url, sku, size, price, currency, status)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+def lowest_prices_by_size(days=90, path=None):
+    """
+    Prix le plus bas relevé pour chaque produit, contenance (et devise) sur les `days`
+    derniers jours. Retourne une liste de dicts {"sku", "size", "currency", "price"}.
+    """
+    since = int(time.time()) - days * 86400
+    conn = _connect_store(path)
+    try:
+        rows = conn.execute(
+            "SELECT sku, size, currency, MIN(price) FROM observations"
+            " WHERE size IS NOT NULL AND observed_at >= ? AND price IS NOT NULL"
+            " GROUP BY sku, size, currency ORDER BY sku, size, currency",
+            (since,),
+        ).fetchall()
+    finally:
+        conn.close()
+    keys = ("sku", "size", "currency", "price")
+    return [dict(zip(keys, row)) for row in rows]
+
+def last_observations(site, limit=10, path=None):
+    """
+    Les `limit` dernières observations d'un site, de la plus récente à la plus ancienne.
+    """
+    conn = _connect_store(path)
+    try:
+        rows = conn.execute(
+            "SELECT observed_at, url, sku, size, price, currency, status FROM observations"
+            " WHERE site = ? ORDER BY observed_at DESC, id DESC LIMIT ?",
+            (site, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    keys = ("observed_at", "url", "sku", "size", "price", "currency", "status")
+    return [dict(zip(keys, row)) for row in rows]
+
+# --- Rapport HTML ---
+
+_CURRENCY_SYMBOLS = {"EUR": "€", "GBP": "£", "USD": "$", "AUD": "A$"}
+
+def _load_template(name):
+    """
+    Charge un gabarit string.Template du répertoire TEMPLATES_DIR.
+    """
+    with open(os.path.join(TEMPLATES_DIR, name), "r", encoding="utf-8") as f:
+        return string.Template(f.read())
+
+def _page_name(number):
+    """
+    Nom du fichier de la page `number` du rapport (la première est index.html).
+    """
+    return "index.html" if number == 1 else f"page-{number}.html"
+
+def _compressed_siblings(data):
+    """
+    Versions précompressées d'un fichier : {".gz": ..., ".br": ...}
+    (.br uniquement si le paquet `brotli` est installé).
+    """
+    siblings = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        siblings[".br"] = brotli.compress(data)
+    return siblings
+
+def write_if_changed(path, data):
+    """
+    Écrit `data` (bytes) de façon atomique dans `path`, ainsi que ses versions
+    précompressées, sauf si le contenu actuel est identique : dans ce cas le fichier
+    n'est pas touché (date de modification et diff de déploiement inchangées) et
+    rien n'est compressé. Retourne True si le fichier a été écrit.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    try:
+        with open(path, "rb") as f:
+            unchanged = hashlib.sha256(f.read()).hexdigest() == digest
+    except OSError:
+        unchanged = False
+
+    extensions = [".gz"] + ([".br"] if brotli is not None else [])
+    if unchanged and all(os.path.exists(path + ext) for ext in extensions):
+        return False
+    _write_atomic(path, data)
+    for ext, compressed in _compressed_siblings(data).items():
+        _write_atomic(path + ext, compressed)
+    return True
+
+def _threshold_label():
+    """
+    Seuil de réduction du catalogue pour le rapport : "5%", ou "5 à 15%" si les
+    produits ont des seuils différents.
+    """
+    thresholds = sorted({product["threshold"] for product in get_catalog().products})
+    if not thresholds:
+        return f"{DEFAULT_DISCOUNT_THRESHOLD:g}%"
+    if len(thresholds) == 1:
+        return f"{thresholds[0]:g}%"
+    return f"{thresholds[0]:g} à {thresholds[-1]:g}%"
+
+def render_report(offers, output_dir="."):
+    """
+    Génère le rapport HTML à partir des gabarits de TEMPLATES_DIR : index.html,
+    puis page-2.html, page-3.html... au-delà de OFFERS_PER_PAGE offres.
+    Les pages dont le contenu n'a pas changé ne sont pas réécrites, et les pages
+    d'une exécution précédente devenues inutiles sont supprimées.
+    """
+    page_template = _load_template("index.html")
+    offer_template = _load_template("offer.html")
+
+    pages = [offers[i:i + OFFERS_PER_PAGE] for i in range(0, len(offers), OFFERS_PER_PAGE)] or [[]]
+    for number, page_offers in enumerate(pages, start=1):
+        if page_offers:
+            items = "".join(
+                offer_template.substitute(
+                    product=html_escape(o["product"]),
+                    current_price=f"{o['current_price']:.2f}",
+                    reference_price=f"{o['reference_price']:.2f}",
+                    currency=html_escape(_CURRENCY_SYMBOLS.get(o["currency"], " " + o["currency"])),
+                    url=html_escape(o["url"]),
+                    site=html_escape(o["site"]),
+                )
+                for o in page_offers
+            )
+            offers_html = f"<ul class='offers-list'>\n{items}</ul>\n"
+        else:
+            offers_html = f"<p class='no-offers'>Aucune offre trouvée avec {_threshold_label()} de réduction ou plus.</p>\n"
+
+        pagination = ""
+        if len(pages) > 1:
+            links = [
+                f"<strong>{n}</strong>" if n == number else f"<a href='{_page_name(n)}'>{n}</a>"
+                for n in range(1, len(pages) + 1)
+            ]
+            pagination = f"<nav class='pagination'>{' '.join(links)}</nav>\n"
+
+        content = page_template.substitute(
+            page_suffix=f" (page {number})" if number > 1 else "",
+            offers=offers_html,
+            pagination=pagination,
+        )
+        write_if_changed(os.path.join(output_dir, _page_name(number)), content.encode("utf-8"))
+
+    # Pages en trop d'une exécution précédente
+    number = len(pages) + 1
+    while os.path.exists(os.path.join(output_dir, _page_name(number))):
+        stale = os.path.join(output_dir, _page_name(number))
+        for path in (stale, stale + ".gz", stale + ".br"):
+            if os.path.exists(path):
+                os.unlink(path)
+        number += 1
+
+# --- Flux des changements ---
+
+def offer_id(site, sku):
+    """
+    Identifiant stable d'une offre : un même produit sur un même site garde
+    le même identifiant d'une exécution à l'autre.
+    """
+    return hashlib.sha1(f"{site}\n{sku}".encode("utf-8")).hexdigest()[:16]
+
+def _feed_offers(observations):
+    """
+    Offres en cours {id: offre}, au prix le plus bas pour un même (site, produit).
+    """
+    offers = {}
+    for o in observations:
+        if not o["is_offer"]:
+            continue
+        key = offer_id(o["site"], o["sku"])
+        if key in offers and offers[key]["price"] <= o["current_price"]:
+            continue
+        offers[key] = {
+            "id": key,
+            "site": o["site"],
+            "sku": o["sku"],
+            "product": o["product"],
+            "url": o["url"],
+            "price": o["current_price"],
+            "currency": o["currency"],
+            "reference_price": o["reference_price"],
+            "discount": round((1 - o["current_price"] / o["reference_price"]) * 100, 1),
+        }
+    return offers
+
+def diff_offers(previous, current):
+    """
+    Changements entre deux ensembles d'offres {id: offre} : offres apparues,
+    disparues et prix modifiés. Retourne un dict {"added", "removed", "price_changes"}.
+    """
+    return {
+        "added": [current[k] for k in sorted(current.keys() - previous.keys())],
+        "removed": [previous[k] for k in sorted(previous.keys() - current.keys())],
+        "price_changes": [
+            dict(current[k], previous_price=previous[k]["price"])
+            for k in sorted(current.keys() & previous.keys())
+            if (current[k]["price"], current[k]["currency"]) != (previous[k]["price"], previous[k]["currency"])
+        ],
     }
-    .no-offers {
-      margin-top: 2em; 
-      text-align: center; 
-      color: #999; 
+
+def _load_feed_state():
+    try:
+        with open(_state_path(FEED_STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"updated_at": None, "offers": {}, "delta": None, "events": []}
+
+def _atom_time(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp or 0))
+
+def _render_atom(state):
+    """
+    Flux Atom des derniers événements (une entrée par offre apparue, disparue ou dont
+    le prix a changé).
+    """
+    feed_template = _load_template("feed.atom")
+    entry_template = _load_template("feed_entry.atom")
+    titles = {"added": "Nouvelle offre", "removed": "Offre terminée", "price_changes": "Prix modifié"}
+    entries = []
+    for event in reversed(state["events"]):
+        offer = event["offer"]
+        summary = f"{offer['price']:.2f} {offer['currency']} (référence : {offer['reference_price']:.2f}, -{offer['discount']}%)"
+        if event["type"] == "price_changes":
+            summary = f"{offer['previous_price']:.2f} → {summary}"
+        entries.append(entry_template.substitute(
+            entry_id=f"urn:offer:{offer['id']}:{event['type']}:{event['at']}",
+            title=html_escape(f"{titles[event['type']]} : {offer['product']} – {offer['site']}"),
+            url=html_escape(offer["url"]),
+            updated=_atom_time(event["at"]),
+            summary=html_escape(summary),
+        ))
+    return feed_template.substitute(
+        feed_id="urn:offers:augustinus-bader",
+        updated=_atom_time(state["updated_at"]),
+        entries="".join(entries),
+    )
+
+def publish_feed(offers, reached, output_dir="."):
+    """
+    Compare les offres de l'exécution (`offers`, observations dont `is_offer` est vrai)
+    à celles de l'exécution précédente et publie dans FEED_DIR : latest.json (offres
+    en cours), delta.json (changements de la dernière exécution qui en a eu) et atom.xml
+    (FEED_MAX_ENTRIES derniers événements).
+    Les offres d'un site absent de `reached` (sites relevés : statut "ok" ou "no_match" ;
+    les autres sont en erreur, bloqués ou ignorés) sont reconduites telles quelles.
+    Les fichiers ne changent que si les offres changent.
+    Retourne les changements de cette exécution (cf. diff_offers).
+    """
+    state = _load_feed_state()
+    previous = state["offers"]
+    current = _feed_offers(offers)
+    for key, offer in previous.items():
+        if offer["site"] not in reached:
+            current.setdefault(key, offer)
+
+    delta = diff_offers(previous, current)
+    if any(delta.values()) or state["updated_at"] is None:
+        now = int(time.time())
+        state["delta"] = {"since": state["updated_at"], "updated_at": now, **delta}
+        state["updated_at"] = now
+        state["offers"] = current
+        for kind in ("removed", "price_changes", "added"):
+            state["events"].extend({"type": kind, "at": now, "offer": offer} for offer in delta[kind])
+        state["events"] = state["events"][-FEED_MAX_ENTRIES:]
+        _write_atomic(_state_path(FEED_STATE_FILE), json.dumps(state, ensure_ascii=False).encode("utf-8"))
+
+    feed_dir = os.path.join(output_dir, FEED_DIR)
+    os.makedirs(feed_dir, exist_ok=True)
+    latest = {"updated_at": state["updated_at"], "offers": sorted(state["offers"].values(), key=lambda o: o["id"])}
+    for name, data in (("latest.json", latest), ("delta.json", state["delta"])):
+        content = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        write_if_changed(os.path.join(feed_dir, name), content.encode("utf-8"))
+    write_if_changed(os.path.join(feed_dir, "atom.xml"), _render_atom(state).encode("utf-8"))
+    return delta
+
+# --- Fonctions de scraping ---
+
+def _new_observation(site_name, url):
+    """
+    Observation d'une page, avant analyse (cf. scrape_product_page).
+    """
+    return {
+        "site": site_name,
+        "url": url,
+        "observed_at": int(time.time()),
+        "status": "no_match",
+        "sku": None,
+        "product": None,
+        "size": None,
+        "current_price": None,
+        "currency": None,
+        "reference_price": 0,
+        "threshold": None,
+        "is_offer": False,
     }
-    footer {
-      text-align: center; 
-      margin-top: 30px;
-      font-size: 0.85em;
-      color: #666;
+
+def _fill_observation(observation, page, require_brand):
+    """
+    Complète `observation` avec le produit reconnu dans `page` (cf. _match_product),
+    s'il a un prix et, avec `require_brand`, si sa marque est mentionnée.
+    """
+    if page["sku"] and (page["brand"] or not require_brand):
+        if page["price"] and page["reference_price"] > 0:
+            observation.update({
+                "status": "ok",
+                "sku": page["sku"],
+                "product": page["product"],
+                "size": page["size"],
+                "current_price": page["price"],
+                "currency": page["currency"],
+                "reference_price": page["reference_price"],
+                "threshold": page["threshold"],
+            })
+
+def scrape_product_page(site_name, url, require_brand=True, adapter=None, currency=None):
+    """
+    Télécharge et analyse une page produit ; retourne une liste d'observations
+    (une par page, ou une par variante avec un adaptateur JSON) avec le statut du relevé :
+    "ok" (prix trouvé pour un produit du catalogue), "no_match" (page lue mais produit,
+    contenance ou prix introuvable), "blocked" (HTTP 403 / 429), "skipped" (hôte en pause,
+    page exclue par robots.txt, budget épuisé) ou "error".
+    `is_offer` (réduction suffisante) est renseigné ensuite par evaluate_discounts
+    (cf. run_polling_plan).
+    `require_brand` exige la mention de la marque du produit (inutile sur le site officiel).
+    `adapter` ("shopify", "next_data" ou "html") force l'adaptateur, sinon celui détecté
+    pour l'hôte est utilisé ; `currency` est la devise des prix JSON qui ne la précisent pas.
+    """
+    observation = _new_observation(site_name, url)
+
+    with instrument(site_name, url) as metrics:
+        observations = _scrape_product_page(observation, require_brand, adapter, currency)
+        metrics["status"] = observation["status"]
+
+    return observations
+
+def _scrape_product_page(observation, require_brand, adapter=None, currency=None):
+    """
+    Remplit `observation` (cf. scrape_product_page) et retourne les observations de la page.
+    """
+    site_name, url = observation["site"], observation["url"]
+    try:
+        used = adapter_for(url, adapter)
+        if used not in (None, "html"):
+            variants = _json_product_pages(url, used, currency)
+            if variants:
+                observations = []
+                for result in variants:
+                    variant = dict(observation, url=result["url"] or url)
+                    _fill_observation(variant, result["page"], require_brand)
+                    observations.append(variant)
+                ok = any(o["status"] == "ok" for o in observations)
+                observation["status"] = "ok" if ok else "no_match"
+                return observations
+            if adapter is None:
+                # L'adaptateur détecté ne donne rien pour ce site : retour au HTML
+                remember_adapter(url, "html")
+        html = fetch(url)
+        page = analyze_page_cached(url, html)
+        _fill_observation(observation, page, require_brand)
+        if used is None:
+            remember_adapter(url, detect_adapter(html) or "html")
+    except (CircuitOpenError, DeadlineExceeded, RobotsDisallowed) as e:
+        print(f"[{site_name}] Ignoré: {e}")
+        observation["status"] = "skipped"
+    except BlockedError as e:
+        print(f"[{site_name}] Bloqué: {e}")
+        observation["status"] = "blocked"
+    except Exception as e:
+        print(f"[{site_name}] Erreur: {e}")
+        observation["status"] = "error"
+    return [observation]
+
+def _json_product_pages(url, adapter, currency):
+    """
+    Résultats {"url", "page"} d'une fiche produit lue avec un adaptateur JSON
+    (cf. shopify_variant_pages, embedded_state_pages), ou [] si le point d'accès
+    JSON n'existe pas ou ne contient aucun produit du catalogue.
+    """
+    try:
+        body = fetch(shopify_json_url(url) if adapter == "shopify" else url, early_stop=False)
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code in (401, 403, 404):
+            return []
+        raise
+    start = time.perf_counter()
+    try:
+        if adapter == "shopify":
+            results = shopify_variant_pages([json.loads(body).get("product") or {}], url, currency)
+        else:
+            results = embedded_state_pages(body, currency)
+    except (ValueError, AttributeError):
+        results = []
+    _add_stage("extract", time.perf_counter() - start)
+    return results
+
+def scrape_listing_page(site_name, url, require_brand=True, tile_selector=None, adapter=None, currency=None):
+    """
+    Télécharge une page de liste (catégorie, recherche, collection) et ses pages
+    suivantes (LISTING_MAX_PAGES au plus) ; retourne une observation par produit
+    du catalogue trouvé sur les vignettes, sans télécharger les fiches produit.
+    Une fiche n'est téléchargée (cf. scrape_product_page) que si la vignette ne suffit
+    pas : contenance, prix ou marque absents (LISTING_MAX_FOLLOW fiches au plus).
+    Si aucun produit n'est trouvé, retourne l'observation de la première page
+    ("no_match", "error", "blocked" ou "skipped").
+    Avec l'adaptateur "shopify" (configuré ou détecté), la collection est lue en JSON
+    (cf. _scrape_shopify_collection) : une observation par variante, sans fiche à suivre.
+    """
+    used = adapter_for(url, adapter)
+    if used == "shopify":
+        observations = _scrape_shopify_collection(site_name, url, require_brand, currency)
+        if observations:
+            return observations
+        if adapter is None:
+            remember_adapter(url, "html")
+
+    observations = []
+    follow = {}
+    first = None
+    page_url = url
+    seen = set()
+    while page_url and page_url not in seen and len(seen) < LISTING_MAX_PAGES:
+        seen.add(page_url)
+        observation = _new_observation(site_name, page_url)
+        first = first or observation
+        with instrument(site_name, page_url) as metrics:
+            listing = _scrape_listing_page(observation, tile_selector, detect=used is None and len(seen) == 1)
+            metrics["status"] = observation["status"]
+        if listing is None:
+            break
+        for tile in listing["tiles"]:
+            tile_url = urljoin(page_url, tile["url"])
+            if tile["follow"] or (require_brand and not tile["page"]["brand"]):
+                follow[tile_url] = True
+                continue
+            tile_observation = _new_observation(site_name, tile_url)
+            _fill_observation(tile_observation, tile["page"], require_brand)
+            observations.append(tile_observation)
+        page_url = listing["next"] and urljoin(page_url, listing["next"])
+
+    for tile_url in list(follow)[:LISTING_MAX_FOLLOW]:
+        observations.extend(scrape_product_page(site_name, tile_url, require_brand))
+    return observations or [first]
+
+def _scrape_listing_page(observation, tile_selector, detect=False):
+    """
+    Télécharge et analyse une page de liste (cf. scrape_listing_page) ; retourne
+    le résultat de _analyze_listing, ou None en cas d'erreur (`observation` indique laquelle).
+    Avec `detect`, mémorise la plateforme de l'hôte (cf. detect_adapter).
+    """
+    site_name, url = observation["site"], observation["url"]
+    try:
+        html = fetch(url, early_stop=False)
+        if detect:
+            remember_adapter(url, detect_adapter(html) or "html")
+        listing = analyze_page_cached(url, html, listing=True, tile_selector=tile_selector)
+    except (CircuitOpenError, DeadlineExceeded, RobotsDisallowed) as e:
+        print(f"[{site_name}] Ignoré: {e}")
+        observation["status"] = "skipped"
+        return None
+    except BlockedError as e:
+        print(f"[{site_name}] Bloqué: {e}")
+        observation["status"] = "blocked"
+        return None
+    except Exception as e:
+        print(f"[{site_name}] Erreur: {e}")
+        observation["status"] = "error"
+        return None
+    _set_metric("tiles", len(listing["tiles"]))
+    if listing["tiles"]:
+        observation["status"] = "ok"
+    return listing
+
+def _scrape_shopify_collection(site_name, url, require_brand, currency):
+    """
+    Lit une collection Shopify page par page via /collections/<handle>/products.json
+    (LISTING_MAX_PAGES pages au plus) ; retourne une observation par variante
+    correspondant à un produit du catalogue, ou [] si le point d'accès JSON n'existe
+    pas ou ne contient aucun produit du catalogue.
+    """
+    observations = []
+    for number in range(1, LISTING_MAX_PAGES + 1):
+        json_url = shopify_json_url(url, listing=True, page=number)
+        observation = _new_observation(site_name, json_url)
+        products = None
+        with instrument(site_name, json_url) as metrics:
+            try:
+                body = fetch(json_url, early_stop=False)
+                start = time.perf_counter()
+                products = json.loads(body).get("products") or []
+                variants = shopify_variant_pages(products, url, currency)
+                _add_stage("extract", time.perf_counter() - start)
+                observation["status"] = "ok" if variants else "no_match"
+            except (CircuitOpenError, DeadlineExceeded, RobotsDisallowed) as e:
+                print(f"[{site_name}] Ignoré: {e}")
+                observation["status"] = "skipped"
+            except requests.HTTPError as e:
+                # Pas de point d'accès JSON : la collection sera lue en HTML
+                if e.response is None or e.response.status_code not in (401, 403, 404):
+                    blocked = isinstance(e, BlockedError)
+                    print(f"[{site_name}] {'Bloqué' if blocked else 'Erreur'}: {e}")
+                    observation["status"] = "blocked" if blocked else "error"
+            except ValueError:
+                pass
+            except Exception as e:
+                print(f"[{site_name}] Erreur: {e}")
+                observation["status"] = "error"
+            metrics["status"] = observation["status"]
+        if observation["status"] in ("error", "skipped", "blocked"):
+            return observations or [observation]
+        if not products:
+            break
+        for result in variants:
+            variant = _new_observation(site_name, result["url"])
+            _fill_observation(variant, result["page"], require_brand)
+            observations.append(variant)
+        if len(products) < SHOPIFY_PAGE_SIZE:
+            break
+    return observations
+
+def scrape_site(site):
+    """
+    Relevé d'un site du registre (cf. load_sites) avec l'extracteur de son site.
+    """
+    return site_extractor(site)(site["name"], site["url"])
+
+# --- Registre des sites ---
+
+def load_sites(path=None):
+    """
+    Lit le registre des sites suivis (SITES_FILE par défaut) et retourne la liste
+    des cibles, dans l'ordre de fusion des résultats dans le rapport.
+
+    Chaque entrée de "sites" (complétée par "defaults") donne le nom du site, son URL
+    ou ses URL ("urls" : une cible par URL, nommée "<nom> #<n>"), le type de page
+    ("kind" : "product" ou "listing"), l'adaptateur ("adapter" : "shopify", "next_data"
+    ou "html", sinon détecté), les filtres ("require_brand", "currency", "tile_selector")
+    et le débit ("rate", "burst" remplacent HOST_RATE et HOST_BURST pour l'hôte).
+    "comment" est ignoré. Chaque cible garde le nom de son entrée dans "site".
+    """
+    with open(path or SITES_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    defaults = data.get("defaults", {})
+    sites = []
+    names = set()
+    for entry in data["sites"]:
+        entry = {**defaults, **entry}
+        entry.pop("comment", None)
+        name = entry["name"]
+        urls = entry.pop("urls", None) or [entry.get("url")]
+        if not all(urls):
+            raise ValueError(f"URL manquante pour le site {name}")
+        if entry.get("kind", "product") not in SITE_KINDS:
+            raise ValueError(f"type de page inconnu pour le site {name} : {entry['kind']}")
+        if entry.get("adapter") not in (None, *SITE_ADAPTERS):
+            raise ValueError(f"adaptateur inconnu pour le site {name} : {entry['adapter']}")
+        for number, url in enumerate(urls, 1):
+            target = dict(entry, url=url, site=name)
+            if len(urls) > 1:
+                target["name"] = f"{name} #{number}"
+            if target["name"] in names:
+                raise ValueError(f"site en double dans le registre : {target['name']}")
+            names.add(target["name"])
+            sites.append(target)
+    return sites
+
+def get_sites():
+    """
+    Sites de l'exécution en cours (registre chargé au premier appel).
+    """
+    global _sites
+    with _sites_lock:
+        if _sites is None:
+            _sites = load_sites()
+        return _sites
+
+def set_sites(sites):
+    """
+    Remplace les sites de l'exécution en cours (ex. registre rechargé par le mode veille) ;
+    les extracteurs seront reconstruits.
+    """
+    global _sites
+    with _sites_lock:
+        _sites = list(sites)
+    with _extractors_lock:
+        _extractors.clear()
+
+def site_extractor(site):
+    """
+    Extracteur d'une cible : fonction (nom, url) -> observations, soit scrape_listing_page
+    (type "listing"), soit scrape_product_page, liée aux options de son site.
+    Construit à la première URL du site puis réutilisé pour toutes ses URL.
+    """
+    key = site.get("site", site["name"])
+    with _extractors_lock:
+        extractor = _extractors.get(key)
+        if extractor is None:
+            options = {k: site[k] for k in ("require_brand", "adapter", "currency") if k in site}
+            if site.get("kind") == "listing":
+                extractor = functools.partial(scrape_listing_page, tile_selector=site.get("tile_selector"), **options)
+            else:
+                extractor = functools.partial(scrape_product_page, **options)
+            _extractors[key] = extractor
+    return extractor
+
+# --- Exécution des relevés ---
+
+def _next_site(sites, pending, running):
+    """
+    Choisit parmi les sites en attente (`pending`, indices dans `sites`) le prochain
+    à lancer : celui dont l'hôte pourra être interrogé le plus tôt (seau à jetons,
+    Retry-After, Crawl-delay), à égalité le premier dans `sites`. Un hôte qui a déjà
+    MAX_FETCHES_PER_HOST relevés en cours (`running`) attend que l'un d'eux se termine.
+    Retourne (indice, attente en secondes) ou None, et la liste des sites en attente
+    dont l'hôte est ignoré (pause plus longue que RETRY_AFTER_MAX, cf. _TokenBucket.skipped).
+    """
+    busy = Counter(urlsplit(sites[i]["url"]).hostname for i in running)
+    best = None
+    seen = set()
+    skipped_hosts = set()
+    skipped = []
+    for index in pending:
+        url = sites[index]["url"]
+        host = urlsplit(url).hostname
+        if host in skipped_hosts:
+            skipped.append(index)
+            continue
+        # Le premier site d'un hôte suffit : les suivants attendent autant que lui
+        if host in seen:
+            continue
+        seen.add(host)
+        if _host_bucket(url).skipped():
+            skipped_hosts.add(host)
+            skipped.append(index)
+            continue
+        if busy[host] >= MAX_FETCHES_PER_HOST:
+            delay = float("inf")
+        else:
+            delay = _host_bucket(url).ready_in()
+        if best is None or delay < best[1]:
+            best = (index, delay)
+            if delay == 0:
+                break
+    return best, skipped
+
+def iter_scrapers(sites, max_workers=MAX_CONCURRENT_FETCHES):
+    """
+    Exécute le relevé de chaque site dans un pool de threads borné et génère
+    (site, observations) pour chaque site dès que son relevé est terminé :
+    les observations ne sont pas accumulées, quel que soit le nombre de sites.
+    Un site n'est lancé que lorsque son hôte peut être interrogé (cf. _next_site) :
+    un hôte ralenti ou occupé n'immobilise pas de thread, les sites des autres
+    hôtes passent devant. Le débit de chaque hôte est celui du site ("rate", "burst").
+    Les sites d'un hôte qui a demandé une pause plus longue que RETRY_AFTER_MAX ne
+    sont pas lancés : ils sont générés avec une observation "skipped".
+    """
+    for site in sites:
+        if "rate" in site or "burst" in site:
+            configure_host(site["url"], site.get("rate"), site.get("burst"))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    running = {}
+    pending = list(range(len(sites)))
+    try:
+        # Au-delà du budget de temps global, on n'attend plus : les sites encore
+        # en attente sont annulés, ceux en cours s'arrêtent d'eux-mêmes (cf. _check_deadline)
+        while (pending or running) and _remaining_time() > 0:
+            delay = float("inf")
+            while pending and len(running) < max_workers:
+                best, skipped = _next_site(sites, pending, running.values())
+                for index in skipped:
+                    pending.remove(index)
+                    site = sites[index]
+                    host = urlsplit(site["url"]).hostname
+                    print(f"[{site['name']}] Ignoré: {host} en pause au-delà de {RETRY_AFTER_MAX}s (Retry-After)")
+                    observation = _new_observation(site["name"], site["url"])
+                    observation["status"] = "skipped"
+                    yield site, [observation]
+                if best is None:
+                    delay = float("inf")
+                    break
+                index, delay = best
+                if delay > 0:
+                    break
+                pending.remove(index)
+                running[executor.submit(scrape_site, sites[index])] = index
+            timeout = min(delay, _remaining_time())
+            if running:
+                done, _ = wait(running, timeout=None if timeout == float("inf") else max(0, timeout),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        observations = future.result()
+                    except Exception as e:
+                        print(f"[{sites[index]['name']}] Erreur: {e}")
+                        continue
+                    yield sites[index], observations
+            elif timeout != float("inf"):
+                time.sleep(max(0, timeout))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    for index in sorted(pending + list(running.values())):
+        print(f"[{sites[index]['name']}] Annulé : budget de temps de l'exécution épuisé")
+
+# --- Réextraction de l'archive ---
+
+def _reextract_record(record, backend, site):
+    """
+    Observations d'une réponse archivée (cf. read_archive_record), obtenues avec le
+    code d'extraction actuel : JSON Shopify, page de liste, état embarqué ou page produit,
+    selon l'URL et la configuration `site` de la cible dans le registre ({} si elle
+    n'y est plus). Aucune requête n'est envoyée.
+    """
+    url, body = record["url"], record["body"]
+    require_brand = site.get("require_brand", True)
+    currency = site.get("currency")
+    path = urlsplit(url).path
+    observation = _new_observation(record["site"] or urlsplit(url).hostname, url)
+    observation["observed_at"] = record["date"]
+    try:
+        if path.endswith(".json"):
+            data = json.loads(body)
+            if path.endswith("/products.json"):
+                page_url = urlunsplit(urlsplit(url)._replace(path=path[:-len("/products.json")], query=""))
+                results = shopify_variant_pages(data.get("products") or [], page_url, currency)
+            else:
+                page_url = urlunsplit(urlsplit(url)._replace(path=path[:-len(".json")], query=""))
+                results = shopify_variant_pages([data.get("product") or {}], page_url, currency)
+        elif site.get("kind") == "listing" and path.rstrip("/") == urlsplit(site["url"]).path.rstrip("/"):
+            listing, _ = _analyze_listing(body, backend, site.get("tile_selector"))
+            results = [
+                {"url": urljoin(url, tile["url"]), "page": tile["page"]}
+                for tile in listing["tiles"]
+                # Vignettes qui auraient nécessité la fiche produit (archivée à part)
+                if not (tile["follow"] or (require_brand and not tile["page"]["brand"]))
+            ]
+        else:
+            results = embedded_state_pages(body, currency) if detect_adapter(body) == "next_data" else []
+            if not results:
+                page, _ = _analyze(body, backend)
+                _fill_observation(observation, page, require_brand)
+                return [observation]
+    except Exception as e:
+        print(f"[{observation['site']}] Erreur: {url}: {e}")
+        observation["status"] = "error"
+        return [observation]
+    observations = []
+    for result in results:
+        variant = dict(observation, url=result["url"] or url)
+        _fill_observation(variant, result["page"], require_brand)
+        observations.append(variant)
+    return observations or [observation]
+
+def _reextract_records(entries, backend):
+    """
+    Relit et réextrait un lot d'entrées d'index (cf. archive_index).
+    Exécutée dans les processus de réextraction.
+    """
+    sites = {site["name"]: site for site in get_sites()}
+    observations = []
+    for entry in entries:
+        record = read_archive_record(entry["path"], entry["offset"], entry["length"])
+        observations.extend(_reextract_record(record, backend, sites.get(record["site"], {})))
+    return observations
+
+def _init_reextract_worker(catalog, sites):
+    """
+    Initialise un processus de réextraction avec le catalogue et le registre du processus principal.
+    """
+    set_catalog(catalog)
+    set_sites(sites)
+
+def reextract_archive(paths=None, output=None, workers=None):
+    """
+    Rejoue les réponses archivées (fichiers `paths`, par défaut tous ceux de ARCHIVE_DIR)
+    dans le code d'extraction actuel, par lots de REEXTRACT_CHUNK_SIZE répartis sur
+    `workers` processus (PARSE_WORKERS par défaut ; 0 = dans le processus courant).
+    Les observations sont écrites dans une base distincte de l'historique
+    (`output`, par défaut REEXTRACT_DB), recréée à chaque appel. Retourne les observations.
+    """
+    if not paths:
+        try:
+            names = sorted(os.listdir(ARCHIVE_DIR))
+        except OSError:
+            names = []
+        paths = [os.path.join(ARCHIVE_DIR, n) for n in names if n.endswith((".warc.zst", ".warc.gz"))]
+    entries = archive_index(paths)
+    backend = resolve_parser_backend(PARSER_BACKEND)
+    chunks = [entries[i:i + REEXTRACT_CHUNK_SIZE] for i in range(0, len(entries), REEXTRACT_CHUNK_SIZE)]
+    workers = PARSE_WORKERS if workers is None else workers
+
+    start = time.perf_counter()
+    if workers <= 0 or len(chunks) <= 1:
+        results = [_reextract_records(chunk, backend) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)), mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_reextract_worker, initargs=(get_catalog().data, get_sites()),
+        ) as pool:
+            results = list(pool.map(_reextract_records, chunks, [backend] * len(chunks)))
+    observations = evaluate_discounts([o for chunk in results for o in chunk])
+
+    output = output or _state_path(REEXTRACT_DB)
+    for suffix in ("", "-wal", "-shm"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(output + suffix)
+    record_observations(observations, output)
+    statuses = Counter(o["status"] for o in observations)
+    print(f"Réextraction : {len(entries)} réponses de {len(paths)} fichiers en {time.perf_counter() - start:.1f} s,"
+          f" {len(observations)} observations ({', '.join(f'{k}: {v}' for k, v in sorted(statuses.items()))})"
+          f" -> {output}")
+    return observations
+
+# --- Plan de relevé ---
+
+def _load_polling():
+    """
+    Charge (une seule fois par exécution) les statistiques de relevé par site.
+    """
+    global _polling
+    with _polling_lock:
+        if _polling is None:
+            try:
+                with open(_state_path(POLLING_FILE), "r", encoding="utf-8") as f:
+                    _polling = json.load(f)
+            except (OSError, ValueError):
+                _polling = {}
+    return _polling
+
+def save_polling():
+    """
+    Enregistre les statistiques de relevé pour l'exécution suivante.
+    """
+    with _polling_lock:
+        if _polling is None:
+            return
+        data = json.dumps(_polling, ensure_ascii=False, sort_keys=True)
+    _write_atomic(_state_path(POLLING_FILE), data.encode("utf-8"))
+
+def _price_signature(observations):
+    """
+    Empreinte des prix relevés sur un site : change dès qu'un prix, une devise
+    ou un produit apparaît, disparaît ou change.
+    """
+    prices = sorted(
+        (o["url"], o["sku"], o["size"], o["current_price"], o["currency"])
+        for o in observations if o["status"] == "ok"
+    )
+    return hashlib.sha1(json.dumps(prices).encode("utf-8")).hexdigest()
+
+def poll_interval(stats):
+    """
+    Intervalle (s) entre deux relevés d'un site, d'après ses statistiques : le taux
+    de changement des prix (un changement par jour a priori, soit deux relevés par jour)
+    fixe l'intervalle ; une offre en cours le ramène à POLL_MIN_INTERVAL ; au-delà
+    d'un échec, il double à chaque échec consécutif (page morte, site qui nous bloque).
+    """
+    if stats["offer"]:
+        interval = POLL_MIN_INTERVAL
+    else:
+        changes_per_day = (stats["changes"] + 1) / (stats["days"] + 1)
+        interval = 86400 / (POLL_SAMPLES_PER_CHANGE * changes_per_day)
+    interval *= 2 ** max(0, stats["failures"] - 1)
+    return min(POLL_MAX_INTERVAL, max(POLL_MIN_INTERVAL, interval))
+
+def plan_polling(sites, budget=POLL_REQUEST_BUDGET, now=None):
+    """
+    Choisit les sites à relever maintenant : ceux dont l'intervalle (cf. poll_interval)
+    est écoulé, les plus en retard d'abord, dans la limite de `budget` requêtes
+    (estimées d'après les relevés précédents ; 0 = sans limite). Un site jamais relevé,
+    ou dont l'URL a changé, est toujours à relever.
+    Retourne (sites à relever, dans l'ordre de `sites` ; dernières observations des
+    autres sites, reconduites avec "carried": True).
+    """
+    now = now or time.time()
+    polling = _load_polling()
+    ranked = []
+    for index, site in enumerate(sites):
+        stats = polling.get(site["name"])
+        if stats is None or stats["url"] != site["url"]:
+            ranked.append((float("inf"), index, 1))
+        else:
+            ranked.append(((now - stats["last_run_at"]) / poll_interval(stats), index, stats["requests"]))
+    due = set()
+    spent = 0
+    for lateness, index, cost in sorted(ranked, key=lambda r: (-r[0], r[1])):
+        if lateness < 1:
+            break
+        if budget and due and spent + cost > budget:
+            continue
+        due.add(index)
+        spent += cost
+    carried = [
+        dict(o, carried=True)
+        for index, site in enumerate(sites) if index not in due
+        for o in polling.get(site["name"], {}).get("observations", [])
+    ]
+    print(f"Plan : {len(due)} site(s) à relever sur {len(sites)} (~{spent:.0f} requêtes)")
+    return [site for index, site in enumerate(sites) if index in due], carried
+
+def update_polling_stats(sites, observations, now=None):
+    """
+    Met à jour les statistiques des sites relevés (`sites`) d'après leurs `observations` :
+    changement de prix depuis le relevé réussi précédent, échecs consécutifs, requêtes
+    envoyées (cf. les mesures de l'exécution), offre en cours (`is_offer`, déjà renseigné
+    par evaluate_discounts) et observations à reconduire.
+    Un site entièrement ignoré (hôte en pause, budget de temps épuisé) reste à relever.
+    """
+    now = now or time.time()
+    with _metrics_lock:
+        sent = {site["name"]: _metrics_requests[site["name"]] for site in sites}
+    by_site = {}
+    for o in observations:
+        if o["status"] != "skipped":
+            by_site.setdefault(o["site"], []).append(o)
+    polling = _load_polling()
+    with _polling_lock:
+        for site in sites:
+            observed = by_site.get(site["name"])
+            if not observed:
+                continue
+            stats = polling.get(site["name"])
+            if stats is None or stats["url"] != site["url"]:
+                stats = {"url": site["url"], "last_ok_at": None, "signature": None, "changes": 0.0,
+                         "days": 0.0, "failures": 0, "requests": 1.0, "offer": False, "observations": []}
+                polling[site["name"]] = stats
+            stats["last_run_at"] = now
+            stats["requests"] = (stats["requests"] + max(1, sent[site["name"]])) / 2
+            if not any(o["status"] in ("ok", "no_match") for o in observed):
+                stats["failures"] += 1
+                continue
+            signature = _price_signature(observed)
+            if stats["last_ok_at"] is not None:
+                elapsed = now - stats["last_ok_at"]
+                decay = 0.5 ** (elapsed / POLL_HALF_LIFE)
+                stats["changes"] = stats["changes"] * decay + (signature != stats["signature"])
+                stats["days"] = stats["days"] * decay + elapsed / 86400
+            stats.update({
+                "last_ok_at": now,
+                "signature": signature,
+                "failures": 0,
+                "offer": any(o["is_offer"] for o in observed),
+                "observations": observed,
+            })
+
+def _refresh_carried(observations):
+    """
+    Réévalue les observations reconduites (cf. plan_polling) avec le catalogue actuel :
+    seuil et prix de référence de leur produit, puis `is_offer` (evaluate_discounts).
+    Celles dont le produit, ou le prix de référence dans leur devise, n'est plus au
+    catalogue sont écartées.
+    """
+    by_sku = get_catalog().by_sku
+    refreshed = []
+    for o in observations:
+        if o["sku"] is not None:
+            product = by_sku.get(o["sku"])
+            reference_price = product and product["reference_prices"].get(o["currency"])
+            if not reference_price:
+                continue
+            o.update({
+                "product": f"{product['name']} {product['size']}",
+                "size": product["size"],
+                "reference_price": reference_price,
+                "threshold": product["threshold"],
+            })
+        refreshed.append(o)
+    return evaluate_discounts(refreshed)
+
+def run_polling_plan(sites, poll_all=False, budget=POLL_REQUEST_BUDGET):
+    """
+    Relève les sites de `sites` qui sont dus dans la limite de `budget` requêtes (tous
+    avec `poll_all`, cf. plan_polling) et génère leurs observations au fil des relevés
+    (cf. iter_scrapers), par lots de STORE_BATCH_SIZE : les réductions de chaque lot
+    sont évaluées une seule fois (evaluate_discounts), puis les statistiques de ses
+    sites mises à jour. Génère ensuite les observations reconduites pour les autres sites,
+    réévaluées avec le catalogue actuel (cf. _refresh_carried).
+    """
+    now = time.time()
+    if poll_all:
+        due, carried = sites, []
+    else:
+        due, carried = plan_polling(sites, budget, now=now)
+    batch_sites, batch = [], []
+    for site, observations in itertools.chain(iter_scrapers(due), [(None, None)]):
+        if site is not None:
+            batch_sites.append(site)
+            batch.extend(observations)
+            if len(batch) < STORE_BATCH_SIZE:
+                continue
+        evaluate_discounts(batch)
+        update_polling_stats(batch_sites, batch, now)
+        yield from batch
+        batch_sites, batch = [], []
+    yield from _refresh_carried(carried)
+
+# --- Répartition en lots (shards) ---
+
+def shard_of(url, shard_count):
+    """
+    Lot (0 .. shard_count - 1) auquel appartient `url`. Le calcul ne dépend que de
+    l'hôte (empreinte SHA-1, stable d'une exécution et d'une machine à l'autre) :
+    toutes les URL d'un hôte sont traitées par le même lot, qui réutilise ses connexions.
+    """
+    host = urlsplit(url).hostname or ""
+    return int(hashlib.sha1(host.encode("utf-8")).hexdigest(), 16) % shard_count
+
+def select_shard(sites, shard_index, shard_count):
+    """
+    Sites du lot `shard_index` sur `shard_count`.
+    """
+    return [site for site in sites if shard_of(site["url"], shard_count) == shard_index]
+
+def _shard_name(shard_index, shard_count):
+    return f"shard-{shard_index}-of-{shard_count}"
+
+def write_partial_results(observations, shard_index, shard_count, started_at):
+    """
+    Écrit les observations d'un lot dans RESULTS_DIR/shard-<i>-of-<n>.json
+    (à fusionner avec merge_results). Retourne le chemin du fichier.
+    """
+    path = os.path.join(RESULTS_DIR, _shard_name(shard_index, shard_count) + ".json")
+    data = {
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "started_at": started_at,
+        "observations": list(observations),
     }
-  </style>
-        """)
-        f.write("</head>\n<body>\n")
-
-        f.write("<h1>Offres Augustinus Bader – The Cream</h1>\n")
-
-        if all_offers:
-            f.write("<ul class='offers-list'>\n")
-            for o in all_offers:
-                line = f"""
-<li class='offer'>
-  <div><strong>{o['product']}</strong> – {o['current_price']:.2f}€ 
-    (référence : {o['reference_price']:.2f}€)</div>
-  <div>Site : <a href="{o['url']}" target="_blank">{o['site']}</a></div>
-</li>
-"""
-                f.write(line)
-            f.write("</ul>\n")
+    _write_atomic(path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+    return path
+
+def merge_results(paths):
+    """
+    Lit les fichiers de résultats partiels `paths` et retourne toutes leurs observations,
+    dans l'ordre du registre des sites (comme une exécution sans lots). Un lot manquant
+    est signalé.
+    """
+    observations = []
+    shards = set()
+    shard_count = None
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        shards.add(data["shard_index"])
+        shard_count = data["shard_count"]
+        observations.extend(data["observations"])
+    if shard_count is not None:
+        missing = sorted(set(range(shard_count)) - shards)
+        if missing:
+            print(f"[fusion] Lots manquants : {', '.join(map(str, missing))} sur {shard_count}")
+    order = {site["name"]: i for i, site in enumerate(get_sites())}
+    observations.sort(key=lambda o: order.get(o["site"], len(order)))
+    return observations
+
+def _shard_argv(args):
+    """
+    Options de la ligne de commande à transmettre aux processus des lots.
+    """
+    argv = []
+    if args.parse_workers is not None:
+        argv += ["--parse-workers", str(args.parse_workers)]
+    if args.parser:
+        argv += ["--parser", args.parser]
+    for site in args.profile:
+        argv += ["--profile", site]
+    if args.all:
+        argv.append("--all")
+    if args.archive:
+        argv.append("--archive")
+    if args.sites:
+        argv += ["--sites", args.sites]
+    return argv
+
+def run_local_shards(shard_count, argv):
+    """
+    Lance `shard_count` processus `scraper.py --shard-index i --shard-count n` en parallèle
+    (avec les options `argv`) et attend leur fin. Retourne les chemins des résultats partiels.
+    """
+    paths = [os.path.join(RESULTS_DIR, _shard_name(i, shard_count) + ".json") for i in range(shard_count)]
+    # Pas de résultats d'une exécution précédente si un lot échoue
+    for path in paths:
+        if os.path.exists(path):
+            os.unlink(path)
+    processes = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), *argv,
+                          "--shard-index", str(i), "--shard-count", str(shard_count)])
+        for i in range(shard_count)
+    ]
+    for i, process in enumerate(processes):
+        if process.wait() != 0:
+            print(f"[lot {i}] Échec (code {process.returncode})")
+    return [path for path in paths if os.path.exists(path)]
+
+def save_state():
+    """
+    Enregistre l'état conservé entre deux exécutions (empreintes, disjoncteurs,
+    adaptateurs, robots.txt, plan de relevé, blocs produit) et élague le cache HTTP.
+    """
+    save_fingerprints()
+    save_circuits()
+    save_adapters()
+    save_robots()
+    save_polling()
+    save_locations()
+    prune_http_cache()
+
+def publish(observations):
+    """
+    Consomme `observations` (liste ou générateur dont les réductions sont déjà évaluées,
+    cf. run_polling_plan, merge_results) et les ajoute à l'historique (sauf celles
+    reconduites d'un relevé précédent, cf. plan_polling) au fil de l'eau, en ne gardant
+    que les offres ; génère ensuite le rapport et le flux des changements.
+    """
+    offers = []
+    reached = set()
+
+    def stored():
+        for o in observations:
+            if o["is_offer"]:
+                offers.append(o)
+            if o["status"] in ("ok", "no_match"):
+                reached.add(o["site"])
+            if not o.get("carried"):
+                yield o
+
+    record_observations(stored())
+    # Offres dans l'ordre du registre, quel que soit l'ordre de fin des relevés
+    order = {site["name"]: i for i, site in enumerate(get_sites())}
+    offers.sort(key=lambda o: order.get(o["site"], len(order)))
+    render_report(offers)
+    publish_feed(offers, reached)
+
+# --- Mode veille (daemon) ---
+
+class _StatusHandler(BaseHTTPRequestHandler):
+    """
+    Point d'accès local du mode veille : /offers, /health et /status (JSON),
+    préparés à la fin de chaque relevé et servis depuis la mémoire.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = _daemon_responses.get(urlsplit(self.path).path.rstrip("/") or "/status")
+        status = 200
+        if body is None:
+            status, body = 404, b'{"error": "not found"}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def _tally_sites(observations, tally):
+    """
+    Transmet `observations` telles quelles en résumant chaque site dans `tally` :
+    {site: {"statuses" (Counter des pages relevées), "fetched_at" (dernière page
+    téléchargée), "carried" (observations reconduites)}}, sans garder les observations.
+    """
+    for o in observations:
+        entry = tally.setdefault(o["site"], {"statuses": Counter(), "fetched_at": None, "carried": False})
+        if o.get("carried"):
+            entry["carried"] = True
+        else:
+            entry["statuses"][o["status"]] += 1
+            if o["status"] != "skipped":
+                entry["fetched_at"] = max(entry["fetched_at"] or 0, o["observed_at"])
+        yield o
+
+def _update_site_health(sites, tally, started_at):
+    """
+    Met à jour l'état de chaque site après un relevé résumé dans `tally` (cf. _tally_sites) :
+    statut ("ok" si au moins une page a été relevée, sinon le statut le plus fréquent,
+    "cancelled" si le site n'a pas été relevé, "not_due" s'il n'était pas dû, cf. plan_polling),
+    date du dernier relevé et du dernier succès, échecs consécutifs.
+    """
+    health = {}
+    for site in sites:
+        previous = _site_health.get(site["name"], {"last_run_at": None, "last_fetch_at": None,
+                                                   "last_ok_at": None, "failures": 0})
+        entry = tally.get(site["name"], {"statuses": Counter(), "fetched_at": None, "carried": False})
+        statuses = entry["statuses"]
+        if entry["carried"] and not statuses:
+            health[site["name"]] = dict(previous, url=site["url"], status="not_due", statuses={})
+            continue
+        status = "ok" if statuses["ok"] else (statuses.most_common(1)[0][0] if statuses else "cancelled")
+        reached = status in ("ok", "no_match")
+        health[site["name"]] = {
+            "url": site["url"],
+            "status": status,
+            "statuses": dict(statuses),
+            "last_run_at": int(started_at),
+            "last_fetch_at": entry["fetched_at"] or previous["last_fetch_at"],
+            "last_ok_at": int(started_at) if reached else previous["last_ok_at"],
+            "failures": 0 if reached else previous["failures"] + 1,
+        }
+    _site_health.clear()
+    _site_health.update(health)
+
+def _daemon_payloads(status):
+    """
+    Corps JSON des réponses du point d'accès local (cf. _StatusHandler).
+    """
+    state = _load_feed_state()
+    offers = {"updated_at": state["updated_at"], "offers": sorted(state["offers"].values(), key=lambda o: o["id"])}
+    health = {"sites": _site_health}
+    payloads = {"/offers": offers, "/health": health, "/status": status}
+    return {path: json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8") for path, data in payloads.items()}
+
+def _watched_mtimes():
+    """
+    Dates de modification des fichiers surveillés par le mode veille.
+    """
+    mtimes = {}
+    for path in (CATALOG_FILE, SITES_FILE, os.path.abspath(__file__)):
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+def _reload_catalog(parse_workers):
+    """
+    Relit catalog.json ; les processus d'analyse sont relancés avec le nouveau catalogue
+    et les résultats mémorisés des pages inchangées sont écartés (cf. _load_fingerprints).
+    Un catalogue illisible est signalé et l'ancien est conservé.
+    """
+    try:
+        catalog = load_catalog()
+    except (OSError, ValueError) as e:
+        print(f"Rechargement du catalogue impossible : {e}")
+        return
+    stop_parse_pool()
+    set_catalog(catalog.data)
+    start_parse_pool(parse_workers)
+    print(f"Catalogue rechargé ({len(catalog.products)} produits)")
+
+def _reload_sites():
+    """
+    Relit le registre des sites (SITES_FILE) et retourne les sites à relever.
+    Un registre illisible est signalé et l'ancien est conservé.
+    """
+    try:
+        sites = load_sites()
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Rechargement du registre des sites impossible : {e}")
+        return get_sites()
+    set_sites(sites)
+    print(f"Registre des sites rechargé ({len(sites)} sites)")
+    return sites
+
+def run_daemon(sites, interval=DAEMON_INTERVAL, address=(DAEMON_HOST, DAEMON_PORT),
+               parse_workers=None, prometheus_path=None, poll_all=False):
+    """
+    Mode veille : relève `sites` toutes les `interval` secondes (seulement ceux qui sont
+    dus, cf. run_polling_plan, sauf avec `poll_all`) dans un processus
+    qui reste actif (session HTTP, connexions, état et processus d'analyse gardés
+    d'un relevé à l'autre) et sert les offres en cours, la santé des sites et l'état
+    du processus sur http://<address>/offers, /health et /status.
+    Chaque relevé publie le rapport, le flux et les mesures comme une exécution normale.
+    SIGHUP, ou une modification de catalog.json ou de sites.json, recharge le catalogue ou
+    le registre des sites sans arrêter le processus ; une modification de scraper.py
+    relance le processus à la fin du relevé en cours.
+    SIGTERM / SIGINT arrête le relevé en cours (cf. DeadlineExceeded) puis le processus.
+    """
+    wakeup = threading.Event()
+    flags = {"reload": False, "stop": False}
+
+    def on_signal(signum, frame):
+        if signum == getattr(signal, "SIGHUP", None):
+            flags["reload"] = True
+        else:
+            flags["stop"] = True
+            start_run_clock(0)
+        wakeup.set()
+
+    for name in ("SIGTERM", "SIGINT", "SIGHUP"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), on_signal)
+
+    server = ThreadingHTTPServer(address, _StatusHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    print(f"Mode veille : http://{host}:{port}/ (relevé toutes les {interval:.0f}s)")
+
+    status = {"pid": os.getpid(), "started_at": int(time.time()), "interval": interval,
+              "cycles": 0, "last_run": None, "next_run_at": int(time.time())}
+    _daemon_responses.update(_daemon_payloads(status))
+    watched = _watched_mtimes()
+    restart = False
+    next_run = time.monotonic()
+    start_parse_pool(parse_workers)
+    try:
+        while not flags["stop"]:
+            if time.monotonic() >= next_run:
+                started_at = time.time()
+                with _metrics_lock:
+                    _metrics_records.clear()
+                    _metrics_requests.clear()
+                start_run_clock()
+                tally = {}
+                try:
+                    publish(_tally_sites(run_polling_plan(sites, poll_all), tally))
+                    save_state()
+                    duration = time.time() - started_at
+                    write_metrics(started_at, duration, prometheus_path=prometheus_path)
+                    _update_site_health(sites, tally, started_at)
+                except Exception as e:
+                    print(f"Erreur du relevé : {e}")
+                    duration = time.time() - started_at
+                next_run = time.monotonic() + interval
+                status.update({
+                    "cycles": status["cycles"] + 1,
+                    "last_run": {"started_at": int(started_at), "duration": round(duration, 3),
+                                 "pages": sum(sum(t["statuses"].values()) for t in tally.values())},
+                    "next_run_at": int(time.time() + interval),
+                })
+                # Chaque réponse est remplacée d'un bloc : une lecture en cours garde l'ancienne
+                _daemon_responses.update(_daemon_payloads(status))
+            wakeup.wait(max(0, min(DAEMON_WATCH_INTERVAL, next_run - time.monotonic())))
+            wakeup.clear()
+            mtimes = _watched_mtimes()
+            if flags["stop"] or not (flags["reload"] or mtimes != watched):
+                continue
+            if mtimes[os.path.abspath(__file__)] != watched[os.path.abspath(__file__)]:
+                restart = True
+                break
+            hangup, flags["reload"] = flags["reload"], False
+            if hangup or mtimes[CATALOG_FILE] != watched[CATALOG_FILE]:
+                _reload_catalog(parse_workers)
+            if hangup or mtimes[SITES_FILE] != watched[SITES_FILE]:
+                sites = _reload_sites()
+            watched = mtimes
+    finally:
+        server.shutdown()
+        server.server_close()
+        stop_parse_pool()
+        save_state()
+    if restart:
+        print("scraper.py modifié : redémarrage")
+        sys.stdout.flush()
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+def main(argv=None):
+    """
+    Relève les sites du registre (sites.json, ou --sites ; tous, ou ceux d'un lot avec
+    --shard-index / --shard-count),
+    compile les offres détectées (réduc >= seuil du produit, 5% par défaut),
+    génère index.html (mise en page simple, responsive)
+    et écrit les mesures de l'exécution dans METRICS_DIR.
+    Un lot écrit seulement ses résultats partiels ; --merge les fusionne et génère le rapport.
+    --daemon répète le relevé à intervalle régulier (cf. run_daemon) ; --reextract rejoue
+    les réponses archivées (--archive) dans le code d'extraction actuel (cf. reextract_archive).
+    """
+    global ARCHIVE_RESPONSES, HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES, PARSER_BACKEND, SITES_FILE, STATE_DIR
+    parser = argparse.ArgumentParser(description="Recherche des offres Augustinus Bader – The Cream.")
+    parser.add_argument("--prometheus", metavar="FICHIER",
+                        help="écrit aussi les mesures au format texte Prometheus")
+    parser.add_argument("--profile", metavar="SITE", action="append", default=[],
+                        help="active cProfile et tracemalloc pour ce site (option répétable)")
+    parser.add_argument("--parse-workers", type=int, default=None, metavar="N",
+                        help=f"processus d'analyse HTML (défaut : {PARSE_WORKERS}, 0 = sans processus dédiés)")
+    parser.add_argument("--parser", choices=["auto", "html.parser", "lxml", "selectolax"], default=None,
+                        help=f"analyseur HTML (défaut : {PARSER_BACKEND})")
+    parser.add_argument("--shard-index", type=int, default=0, metavar="I",
+                        help="numéro du lot à traiter (0 .. N-1)")
+    parser.add_argument("--shard-count", type=int, default=1, metavar="N",
+                        help="nombre de lots ; au-delà de 1, seuls les résultats partiels sont écrits")
+    parser.add_argument("--local-shards", type=int, default=0, metavar="N",
+                        help="lance N lots en processus parallèles puis fusionne leurs résultats")
+    parser.add_argument("--merge", nargs="+", metavar="FICHIER",
+                        help="fusionne des résultats partiels et génère le rapport (sans scraping)")
+    parser.add_argument("--all", action="store_true",
+                        help="relève tous les sites, qu'ils soient dus ou non selon le plan de relevé")
+    parser.add_argument("--daemon", action="store_true",
+                        help="mode veille : relevés périodiques et point d'accès local (offres, santé des sites)")
+    parser.add_argument("--interval", type=float, default=DAEMON_INTERVAL, metavar="SECONDES",
+                        help=f"intervalle entre deux relevés en mode veille (défaut : {DAEMON_INTERVAL})")
+    parser.add_argument("--listen", default=f"{DAEMON_HOST}:{DAEMON_PORT}", metavar="HÔTE:PORT",
+                        help="adresse du point d'accès local en mode veille")
+    parser.add_argument("--sites", metavar="FICHIER",
+                        help=f"registre des sites suivis (défaut : {os.path.basename(SITES_FILE)})")
+    parser.add_argument("--archive", action="store_true",
+                        help=f"archive les réponses téléchargées (WARC compressé dans {ARCHIVE_DIR}/)")
+    parser.add_argument("--reextract", nargs="*", metavar="FICHIER",
+                        help="réextrait les réponses archivées (tous les fichiers de l'archive si aucun n'est"
+                             " donné) avec le code actuel, sans scraping")
+    parser.add_argument("--reextract-output", metavar="FICHIER",
+                        help=f"base SQLite produite par --reextract (défaut : {STATE_DIR}/{REEXTRACT_DB})")
+    args = parser.parse_args(argv)
+    PROFILE_SITES.update(args.profile)
+    if args.parser:
+        PARSER_BACKEND = resolve_parser_backend(args.parser)
+    ARCHIVE_RESPONSES = ARCHIVE_RESPONSES or args.archive
+    if args.sites:
+        SITES_FILE = os.path.abspath(args.sites)
+    started_at = time.time()
+
+    if args.reextract is not None:
+        reextract_archive(args.reextract, args.reextract_output, args.parse_workers)
+        return
+
+    if args.merge or args.local_shards:
+        paths = args.merge or run_local_shards(args.local_shards, _shard_argv(args))
+        publish(merge_results(paths))
+        return
+
+    if not 0 <= args.shard_index < args.shard_count:
+        parser.error("--shard-index doit être compris entre 0 et --shard-count - 1")
+    if args.daemon:
+        if args.shard_count > 1:
+            parser.error("--daemon ne se combine pas avec les lots")
+        host, _, port = args.listen.rpartition(":")
+        run_daemon(get_sites(), args.interval, (host or DAEMON_HOST, int(port)), args.parse_workers, args.prometheus,
+                   args.all)
+        return
+    sharded = args.shard_count > 1
+    sites = get_sites()
+    if sharded:
+        sites = select_shard(sites, args.shard_index, args.shard_count)
+        # État propre au lot (empreintes, disjoncteurs, adaptateurs de ses hôtes), et cache
+        # HTTP à part : les lots lancés en même temps (--local-shards) élaguent chacun le leur
+        STATE_DIR = os.path.join(STATE_DIR, _shard_name(args.shard_index, args.shard_count))
+        HTTP_CACHE_DIR = os.path.join(HTTP_CACHE_DIR, _shard_name(args.shard_index, args.shard_count))
+        HTTP_CACHE_MAX_BYTES //= args.shard_count
+
+    # 1. Relever les sites (en parallèle, dans le budget de temps) et publier les
+    #    observations au fil des relevés : résultats partiels du lot, ou historique
+    #    et génération HTML
+    start_run_clock()
+    start_parse_pool(args.parse_workers)
+    try:
+        # Budget de requêtes partagé entre les lots (au moins une requête par lot)
+        budget = max(1, POLL_REQUEST_BUDGET // args.shard_count) if POLL_REQUEST_BUDGET else 0
+        observations = run_polling_plan(sites, args.all, budget)
+        if sharded:
+            write_partial_results(observations, args.shard_index, args.shard_count, started_at)
         else:
-            f.write("<p class='no-offers'>Aucune offre trouvée avec 5% de réduction ou plus.</p>\n")
+            publish(observations)
+    finally:
+        stop_parse_pool()
+    save_state()
 
-        f.write("<footer>Mis à jour automatiquement, 2 fois par jour.</footer>\n")
-        f.write("</body></html>\n")
+    # 2. Mesures de l'exécution
+    suffix = _shard_name(args.shard_index, args.shard_count) if sharded else None
+    write_metrics(started_at, time.time() - started_at, prometheus_path=args.prometheus, suffix=suffix)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
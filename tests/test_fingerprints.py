@@ -0,0 +1,46 @@
+"""
+Réutilisation des résultats d'extraction d'une page inchangée (analyze_page_cached)
+et invalidation après un rechargement du catalogue.
+"""
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import scraper  # noqa: E402
+
+PAGE = "<html><body><h1>Augustinus Bader The Cream 50 ml</h1><p>229,00 €</p></body></html>"
+URL = "https://shop.example/the-cream"
+
+
+@pytest.fixture(autouse=True)
+def state(tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(scraper, "_fingerprints", None)
+    monkeypatch.setattr(scraper, "_locations", None)
+    catalog = scraper.load_catalog().data
+    scraper.set_catalog(catalog)
+    yield catalog
+    scraper.set_catalog(catalog)
+
+
+def test_unchanged_page_reuses_result():
+    first = scraper.analyze_page_cached(URL, PAGE)
+    assert scraper.analyze_page_cached(URL, PAGE) is first
+
+
+def test_catalog_reload_applies_new_threshold(state):
+    page = scraper.analyze_page_cached(URL, PAGE)
+    assert (page["threshold"], page["reference_price"]) == (5, 265.0)
+
+    catalog = copy.deepcopy(state)
+    catalog["threshold"] = 1
+    for product in catalog["products"]:
+        product["reference_prices"]["EUR"] = 300.0
+    scraper.set_catalog(catalog)
+
+    page = scraper.analyze_page_cached(URL, PAGE)
+    assert (page["threshold"], page["reference_price"]) == (1, 300.0)
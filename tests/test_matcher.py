@@ -0,0 +1,94 @@
+"""
+Comportement de scan_text / _number_value / _match_product sur les formats de prix,
+les devises, les contenances et les termes d'exclusion du catalogue (catalog.json).
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import scraper  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def catalog():
+    scraper.set_catalog(scraper.load_catalog().data)
+    return scraper.get_catalog()
+
+
+@pytest.mark.parametrize("number, expected", [
+    ("1.234,56", 1234.56),
+    ("1,234.56", 1234.56),
+    ("1\u00a0234,56", 1234.56),
+    ("1\u202f234,56", 1234.56),
+    ("229,00", 229.0),
+    ("229.00", 229.0),
+    ("170,5", 170.5),
+    ("170", 170.0),
+    ("12.345", 12345.0),
+])
+def test_number_value(number, expected):
+    assert scraper._number_value(number) == expected
+
+
+@pytest.mark.parametrize("text, prices", [
+    ("Prix : 1.234,56 €", {"EUR": 1234.56}),
+    ("229,00 €", {"EUR": 229.0}),
+    ("€229", {"EUR": 229.0}),
+    ("170 EUR", {"EUR": 170.0}),
+    ("£120.50", {"GBP": 120.5}),
+    ("A$ 250", {"AUD": 250.0}),
+    ("AU$250", {"AUD": 250.0}),
+    ("US $99", {"USD": 99.0}),
+])
+def test_scan_text_prices(text, prices):
+    assert scraper.scan_text(text)["prices"] == prices
+
+
+def test_scan_text_keeps_first_price_per_currency():
+    scan = scraper.scan_text("229,00 € au lieu de 265,00 € - £200")
+    assert scan["prices"] == {"EUR": 229.0, "GBP": 200.0}
+
+
+def test_currency_code_inside_word_is_ignored():
+    assert scraper.scan_text("EUROPE 12 SEURAT 5")["prices"] == {}
+
+
+def test_scan_text_sizes():
+    assert scraper.scan_text("The Cream 50ml ou 30 mL")["sizes"] == {"50 ml", "30 ml"}
+
+
+def test_match_product_with_brand_size_and_price():
+    page = scraper._match_product("Augustinus Bader The Cream 50 ml 229,00 €")
+    assert page["sku"] == "augustinus-bader-the-cream-50ml"
+    assert page["brand"] is True
+    assert (page["price"], page["currency"], page["reference_price"]) == (229.0, "EUR", 265.0)
+
+
+def test_match_product_price_in_other_currency_only():
+    page = scraper._match_product("Augustinus Bader The Cream 50 ml A$ 400")
+    assert page["sku"] == "augustinus-bader-the-cream-50ml"
+    assert page["price"] is None
+
+
+@pytest.mark.parametrize("text", [
+    "Augustinus Bader The Cream 15 ml 95 €",
+    "Augustinus Bader The Cream 50 ml (existe en 15 ml) 229 €",
+    "Augustinus Bader The Rich Cream 50 ml 265 €",
+    "Augustinus Bader The Cream travel 50 ml 229 €",
+])
+def test_match_product_exclusions(text):
+    assert scraper._match_product(text)["sku"] is None
+
+
+@pytest.mark.parametrize("text", [
+    "Augustinus Bader TheCreamy 50 ml 229 €",
+    "Augustinus Bader The Creamed 50 ml 229 €",
+    "Augustinus Bader The Creamery 50 ml 229 €",
+])
+def test_anchor_inside_longer_word_is_ignored(text):
+    scan = scraper.scan_text(text)
+    assert "The Cream" not in scan["terms"]
+    assert scraper._match_product(text)["sku"] is None
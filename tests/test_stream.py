@@ -0,0 +1,71 @@
+"""
+Arrêt anticipé de la lecture (_read_body) : décidé sur les marqueurs relevés par
+_PriceMarkerScanner, seulement quand le début de page lu donne déjà un produit du
+catalogue avec sa marque et son prix.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import scraper  # noqa: E402
+
+FILLER = "<p>" + "lorem ipsum " * 2000 + "</p>"
+PRODUCT = {
+    "@context": "https://schema.org",
+    "@type": "Product",
+    "name": "The Cream 50 ml",
+    "brand": {"@type": "Brand", "name": "Augustinus Bader"},
+    "offers": {"@type": "Offer", "price": "229.00", "priceCurrency": "EUR"},
+}
+META = ('<meta property="og:title" content="{title}">'
+        '<meta property="product:price:amount" content="229.00">'
+        '<meta property="product:price:currency" content="EUR">')
+
+
+class _Response:
+    encoding = "utf-8"
+
+    def __init__(self, html, chunk_size):
+        self.body = html.encode("utf-8")
+        self.chunk_size = chunk_size
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+
+
+@pytest.fixture(autouse=True)
+def catalog():
+    scraper.set_catalog(scraper.load_catalog().data)
+
+
+def _read(html, chunk_size):
+    body, _, truncated = scraper._read_body(_Response(html, chunk_size), 10 ** 9)
+    return body.decode("utf-8"), truncated
+
+
+@pytest.mark.parametrize("html", [
+    f'<script type="application/ld+json">{json.dumps(PRODUCT)}</script>{FILLER}',
+    META.format(title="Augustinus Bader &ndash; The Cream 50 ml") + FILLER,
+    '<h1 itemprop="name">Augustinus Bader The Cream 50 ml</h1><span itemprop="price">229.00</span>'
+    f'<span itemprop="priceCurrency">EUR</span>{FILLER}',
+])
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 4096])
+def test_stops_on_matched_structured_product(html, chunk_size):
+    body, truncated = _read(html, chunk_size)
+    assert truncated
+    # Le début de page conservé suffit à l'extraction
+    page = scraper._structured_page(scraper.parse_document(body, scraper.PARSER_BACKEND))
+    assert (page["sku"], page["price"]) == ("augustinus-bader-the-cream-50ml", 229.0)
+
+
+@pytest.mark.parametrize("title", ["The Cream 50 ml", "Augustinus Bader The Rich Cream 50 ml"])
+def test_reads_whole_page_without_matched_product(title):
+    html = META.format(title=title) + FILLER
+    body, truncated = _read(html, 64)
+    assert not truncated
+    assert body == html